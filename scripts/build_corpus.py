@@ -0,0 +1,20 @@
+from neuralsutra.data.corpus import write_corpus
+from neuralsutra.data.generate import generate_shards, load_shards
+from neuralsutra.vocab import build_vocab, save_vocab
+
+
+def main() -> None:
+    # Generate a raw curriculum dataset in parallel, streamed to shard files
+    shards = generate_shards("data/shards", samples_per_class=2000)
+
+    # Build and save the vocab that the corpus is tokenized with
+    vocab = build_vocab(load_shards(shards))
+    save_vocab(vocab, "models/vocab.json")
+
+    # Tokenize the shuffled dataset once into a memory-mappable corpus
+    count = write_corpus(load_shards(shards, seed=0), vocab, "data/corpus")
+    print(f"Wrote {count} tokenized samples to data/corpus.")
+
+
+if __name__ == "__main__":
+    main()
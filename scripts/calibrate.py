@@ -0,0 +1,14 @@
+from neuralsutra.benchmarks.calibrate import calibrate_multiply
+
+
+def main() -> None:
+    print("NEURALSUTRA: MULTIPLICATION ENGINE CALIBRATION")
+    thresholds = calibrate_multiply()
+
+    print("Recommended crossovers for neuralsutra/kernels/multiply.py:")
+    for name, value in thresholds.items():
+        print(f"  {name} = {value}")
+
+
+if __name__ == "__main__":
+    main()
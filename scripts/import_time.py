@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+# Modules that short-lived tools and workers import, fastest first
+MODULES = [
+    "neuralsutra.kernels.multiply",
+    "neuralsutra.kernels.integrate",
+    "neuralsutra.verification",
+    "neuralsutra.engine",
+    "neuralsutra.compiler",
+    "neuralsutra.trainer",
+]
+
+# Heavy dependencies that only training and routing should pull in
+HEAVY = ["torch", "sklearn"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, *[m for m in {heavy!r} if m in sys.modules])
+"""
+
+
+def import_time(module: str, repeats: int = 3) -> tuple[float, list[str]]:
+    """
+    Return the best cold import time of a module over fresh interpreters, along with
+    the heavy dependencies it imported.
+    """
+    best, heavy = float("inf"), []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        best, heavy = min(best, float(out[0])), out[1:]
+
+    return best, heavy
+
+
+def main() -> None:
+    print(f"{'Module':<32} | {'Import':>8} | Heavy dependencies")
+    for module in MODULES:
+        elapsed, heavy = import_time(module)
+        print(f"{module:<32} | {elapsed:>7.3f}s | {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import glob
+import os
+import random
+import time
+
+import torch
+
+from neuralsutra.data.generate import generate_dataset, load_shards
+from neuralsutra.router import Router
+from neuralsutra.trainer import evaluate_router, quantize_model, save_model
+from neuralsutra.vocab import load_vocab
+
+
+def mean_latency(
+    model: torch.nn.Module, dataset: list[tuple[str, int]], vocab
+) -> float:
+    """Return the mean batch-of-1 routing latency of the model over the dataset."""
+    start = time.perf_counter()
+    evaluate_router(model, dataset, vocab, batch_size=1)
+    return (time.perf_counter() - start) / len(dataset)
+
+
+def main() -> None:
+    # Load the full-precision router
+    try:
+        vocab = load_vocab("models/vocab.json")
+        model = Router(vocab_size=len(vocab) + 1)
+        model.load_state_dict(torch.load("models/router.pth"))
+    except FileNotFoundError:
+        return print("Error: model files missing from 'models/'.")
+
+    model.eval()
+    quantized = quantize_model(model)
+
+    # The router is trained on the shards written by scripts/build_corpus.py
+    shards = sorted(glob.glob("data/shards/shard-*.tsv"))
+    if not shards:
+        return print("Error: training shards missing from 'data/shards/'.")
+    trained = {expr for expr, _ in load_shards(shards)}
+
+    # Hold out freshly generated samples that do not occur in the training data
+    random.seed(1234)
+    held_out = [
+        (expr, label)
+        for expr, label in generate_dataset(samples_per_class=500)
+        if expr not in trained
+    ]
+
+    fp32_acc = evaluate_router(model, held_out, vocab)
+    int8_acc = evaluate_router(quantized, held_out, vocab)
+
+    save_model(quantized, "models/router_int8.pth")
+
+    print(f"FP32 Accuracy : {fp32_acc:.2f}%")
+    print(f"INT8 Accuracy : {int8_acc:.2f}%")
+    print(f"FP32 Latency  : {mean_latency(model, held_out[:200], vocab) * 1e3:.3f}ms")
+    print(
+        f"INT8 Latency  : {mean_latency(quantized, held_out[:200], vocab) * 1e3:.3f}ms"
+    )
+    print(f"FP32 Size     : {os.path.getsize('models/router.pth') / 1e6:.2f}MB")
+    print(f"INT8 Size     : {os.path.getsize('models/router_int8.pth') / 1e6:.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
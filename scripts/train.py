@@ -1,17 +1,21 @@
-from neuralsutra.data.generate import generate_dataset
+from neuralsutra.data.corpus import TokenCorpus
 from neuralsutra.trainer import train_router
-from neuralsutra.vocab import build_vocab, save_vocab
+from neuralsutra.vocab import load_vocab
 
 
-if __name__ == "__main__":
-    # Generate a raw curriculum dataset
-    raw_data = generate_dataset()
+def main() -> None:
+    # Memory-map the tokenized corpus and its vocab, written by scripts/build_corpus.py
+    try:
+        vocab = load_vocab("models/vocab.json")
+        corpus = TokenCorpus.load("data/corpus")
+    except FileNotFoundError:
+        return print(
+            "Error: corpus missing, run 'python -m scripts.build_corpus' first."
+        )
 
-    # Build vocab
-    vocab = build_vocab(raw_data)
+    # Train and save the model, streaming batches from the corpus
+    train_router(corpus, vocab, "models/router.pth")
 
-    # Train and save the model
-    train_router(raw_data, vocab, "models/router.pth")
 
-    # Save the vocab
-    save_vocab(vocab, "models/vocab.json")
+if __name__ == "__main__":
+    main()
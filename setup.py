@@ -14,9 +14,11 @@ setup(
         "torch",
         "sympy",
         "numpy",
-        "scikit-learn",
         "pytest",
     ],
+    extras_require={
+        "onnx": ["onnx", "onnxruntime"],
+    },
     description="A hybrid neuro-symbolic integration engine using Vedic mathematics kernels",
     long_description=long_description,
     long_description_content_type="text/markdown",
@@ -0,0 +1,148 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from sympy import Expr, Symbol
+
+from neuralsutra.compiler import Compiler
+
+
+class AsyncCompiler:
+    """
+    Asyncio front-end for a Compiler. Each compilation runs in an executor, so that it
+    does not block the event loop, and the routing requests of concurrent compilations
+    are coalesced into micro-batches for the router model.
+
+    A micro-batch is sent to the router as soon as it holds max_batch_size integrands, or
+    max_wait seconds after its first request, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        compiler: Compiler,
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.compiler = compiler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._executor = executor or ThreadPoolExecutor()
+        self._owns_executor = executor is None
+
+        # A single thread runs the router, so batches are evaluated one at a time
+        self._router_executor = ThreadPoolExecutor(max_workers=1)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: list[tuple[list[Expr], asyncio.Future]] = []
+        self._pending_size = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+
+        # Number of routing requests received and router batches run
+        self.requests = 0
+        self.batches = 0
+
+    async def __aenter__(self) -> "AsyncCompiler":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Fail the queued routing requests and shut down the executors. The executors are
+        shut down off the event loop, as compilation threads that are still running (e.g.
+        after a timeout) route through it.
+        """
+        self._closed = True
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("AsyncCompiler is closed."))
+
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self) -> None:
+        """Shut down the executors owned by this front-end."""
+        if self._owns_executor:
+            self._executor.shutdown()
+        self._router_executor.shutdown()
+
+    async def compile(self, expr: Expr, var: Symbol, max_passes: int = 10) -> Expr:
+        """Compile an expression without blocking the event loop."""
+        self._loop = asyncio.get_running_loop()
+
+        return await self._loop.run_in_executor(
+            self._executor,
+            partial(
+                self.compiler.compile,
+                expr,
+                var,
+                max_passes=max_passes,
+                batched=True,
+                router=self._route_threadsafe,
+            ),
+        )
+
+    async def route(self, nodes: list[Expr]) -> list[int]:
+        """Queue integrands for the next micro-batch and wait for their intents."""
+        if self._closed:
+            raise RuntimeError("AsyncCompiler is closed.")
+
+        loop = self._loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self.requests += 1
+        self._pending.append((nodes, future))
+        self._pending_size += len(nodes)
+
+        if self._pending_size >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _route_threadsafe(self, nodes: list[Expr]) -> list[int]:
+        """Route integrands from a compilation thread through the event loop's batcher."""
+        return asyncio.run_coroutine_threadsafe(self.route(nodes), self._loop).result()
+
+    def _flush(self) -> None:
+        """Send every queued integrand to the router in one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending, self._pending_size = self._pending, [], 0
+        if not batch:
+            return
+
+        self.batches += 1
+        nodes = [node for request, _ in batch for node in request]
+        intents = self._loop.run_in_executor(
+            self._router_executor, self.compiler.predict_batch, nodes
+        )
+
+        def distribute(done: asyncio.Future) -> None:
+            # Hand each request back the slice of intents for its own integrands
+            error = done.exception()
+            start = 0
+            for request, future in batch:
+                stop = start + len(request)
+                # Cancelled requests still occupy their slice of the batch
+                if not future.done():
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(done.result()[start:stop])
+                start = stop
+
+        intents.add_done_callback(distribute)
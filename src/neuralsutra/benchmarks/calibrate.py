@@ -0,0 +1,85 @@
+import random
+import time
+from typing import Callable
+
+from neuralsutra.kernels import multiply
+from neuralsutra.kernels.poly import CoeffPoly
+
+
+def _random_poly(length: int, rng: random.Random) -> CoeffPoly:
+    """Return a dense polynomial with random non-zero integer coefficients."""
+    return CoeffPoly(
+        [rng.choice([-1, 1]) * rng.randint(1, 10**6) for _ in range(length)]
+    )
+
+
+def _time(
+    engine: Callable[[CoeffPoly, CoeffPoly], CoeffPoly],
+    p1: CoeffPoly,
+    p2: CoeffPoly,
+    repeats: int,
+) -> float:
+    """Return the best wall time of engine(p1, p2) over a number of repeats."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine(p1, p2)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _crossover(
+    slow: Callable[[CoeffPoly, CoeffPoly], CoeffPoly],
+    fast: Callable[[CoeffPoly, CoeffPoly], CoeffPoly],
+    lengths: list[int],
+    repeats: int,
+    rng: random.Random,
+) -> int:
+    """Return the first length from which fast consistently beats slow."""
+    crossover = lengths[-1]
+    for length in reversed(lengths):
+        p1, p2 = _random_poly(length, rng), _random_poly(length, rng)
+        if _time(fast, p1, p2, repeats) >= _time(slow, p1, p2, repeats):
+            break
+        crossover = length
+    return crossover
+
+
+def calibrate_multiply(repeats: int = 5, seed: int = 0) -> dict[str, int]:
+    """
+    Time the schoolbook, Karatsuba and NTT multiplication engines on dense random
+    polynomials and return the crossover lengths to use for KARATSUBA_THRESHOLD and
+    NTT_THRESHOLD in neuralsutra.kernels.multiply.
+    """
+    rng = random.Random(seed)
+    base_threshold = multiply.KARATSUBA_THRESHOLD
+
+    def karatsuba_one_level(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+        # Split once, then multiply the halves with the schoolbook convolution
+        multiply.KARATSUBA_THRESHOLD = len(p1.coeffs) // 2 + 1
+        return multiply.karatsuba(p1, p2)
+
+    try:
+        karatsuba_threshold = _crossover(
+            multiply.urdhva,
+            karatsuba_one_level,
+            [8, 12, 16, 24, 32, 48, 64, 96, 128],
+            repeats,
+            rng,
+        )
+
+        multiply.KARATSUBA_THRESHOLD = karatsuba_threshold
+        ntt_threshold = _crossover(
+            multiply.karatsuba,
+            multiply.ntt,
+            [128, 192, 256, 384, 512, 768, 1024, 1536, 2048],
+            repeats,
+            rng,
+        )
+    finally:
+        multiply.KARATSUBA_THRESHOLD = base_threshold
+
+    return {
+        "KARATSUBA_THRESHOLD": karatsuba_threshold,
+        "NTT_THRESHOLD": ntt_threshold,
+    }
@@ -55,7 +55,7 @@ class BenchmarkRunner:
             v_res = None
 
         # Display validation and performance metrics
-        is_correct = verify_integration(expr, v_res, var)
+        is_correct = verify_integration(expr, v_res, var, vectorized=True)
         speedup = t_sympy / t_ns if t_ns > 0 else 0
 
         print(f"  - Verification       : {'PASSED' if is_correct else 'FAILED'}")
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sympy import Add, Basic, Mul, Number, Symbol
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry once the capacity is
+    reached. Hits, misses and evictions are counted so that the cache can be tuned.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the value stored for key (marking it as recently used), or default."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value for key, evicting the least recently used entry if full."""
+        if self.capacity <= 0:
+            return
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the size, capacity and hit/miss/eviction counters of the cache."""
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def structural_key(node: Basic, abstract_coefficients: bool = True) -> Hashable:
+    """
+    Build a canonical, hashable key describing the structure of a SymPy expression tree.
+
+    If abstract_coefficients is True, numeric coefficients and constant terms (the numbers
+    that appear directly as arguments of Add and Mul nodes) are replaced by a placeholder,
+    so that e.g. 3*x**2*sin(x) and 5*x**2*sin(x) share a key. Exponents and function
+    arguments are kept, as they change the mathematical intent of the expression.
+    """
+
+    def walk(n: Basic, is_coefficient: bool) -> Hashable:
+        if isinstance(n, Number):
+            return ("Number",) if is_coefficient else n
+        if isinstance(n, Symbol):
+            return ("Symbol", n.name)
+        if not n.args:
+            return n
+
+        # Only the direct numeric arguments of Add and Mul are treated as coefficients
+        abstract = abstract_coefficients and isinstance(n, (Add, Mul))
+        return (type(n).__name__,) + tuple(walk(a, abstract) for a in n.args)
+
+    return walk(node, False)
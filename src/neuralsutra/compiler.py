@@ -1,73 +1,316 @@
-from sympy import Expr, Integral, Symbol, nsimplify, srepr, sympify
-import torch
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import threading
+import warnings
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
+from sympy import Add, Expr, Integral, Symbol, nsimplify, sympify
+
+from neuralsutra.cache import LRUCache, structural_key
 from neuralsutra.engine import Engine
-from neuralsutra.router import Router
+from neuralsutra.parallel import (
+    CompileResult,
+    compile_item,
+    init_worker,
+    run_item,
+    solve_task,
+)
+from neuralsutra.prerouter import classify
+from neuralsutra.tokenizer import Tokenizer
 from neuralsutra.vocab import load_vocab
 
+if TYPE_CHECKING:
+    from torch import Tensor
+    from torch.nn import Module
+
 
 class Compiler:
     """
     Perform a multi-pass transformation on SymPy AST sequences, using the router model
     to dispatch sub-tasks to optimised Vedic kernels.
+
+    Routing decisions are memoised in a bounded LRU cache of cache_size entries, keyed on
+    the structure of the integrand. If abstract_coefficients is True, integrands that only
+    differ in their numeric coefficients share a cache entry.
+
+    If workers is greater than zero, the independent additive terms of large integrands
+    (at least parallel_threshold terms) are compiled in a pool of worker processes, each
+    of which loads the router model once.
+
+    If runtime_path points to an exported router (TorchScript .pt or ONNX .onnx, see
+    trainer.save_model), it is used for inference instead of the eager PyTorch module,
+    which remains the fallback if the export cannot be loaded.
+
+    If quantized is True, model_path holds the weights of a dynamically int8-quantized
+    router (see trainer.quantize_model and scripts/quantize.py).
+
+    If prerouter is True, structurally unambiguous integrands are routed by rules instead
+    of the neural router. Integrands for which the router's softmax confidence is below
+    confidence_threshold fall back to SymPy. How often each path fires is counted in
+    route_counts.
+
+    If max_length is set, token sequences longer than max_length are summarized and
+    truncated before routing (see Tokenizer.encode), which bounds the routing latency of
+    huge expressions. The router should be trained with the same max_length.
+
+    If mmap is True, the router weights are memory-mapped from model_path rather than
+    read into memory, so compilers in different processes (such as the workers of
+    compile and compile_many) share one read-only copy of the weights through the page
+    cache, and start up without reading the whole file.
     """
 
-    def __init__(self, model_path: str, vocab_path: str) -> None:
+    def __init__(
+        self,
+        model_path: str,
+        vocab_path: str,
+        cache_size: int = 1024,
+        abstract_coefficients: bool = True,
+        workers: int = 0,
+        parallel_threshold: int = 8,
+        runtime_path: Optional[str] = None,
+        quantized: bool = False,
+        prerouter: bool = True,
+        confidence_threshold: float = 0.0,
+        max_length: Optional[int] = None,
+        mmap: bool = False,
+    ) -> None:
+        if mmap and quantized:
+            raise ValueError("Quantized router weights cannot be memory-mapped.")
+
+        self.model_path = model_path
+        self.vocab_path = vocab_path
+        self.runtime_path = runtime_path
+        self.quantized = quantized
+        self.mmap = mmap
+
+        self.cache = LRUCache(cache_size)
+        self.abstract_coefficients = abstract_coefficients
+
+        self.prerouter = prerouter
+        self.confidence_threshold = confidence_threshold
+        self.max_length = max_length
+        self.route_counts = {
+            "prerouter": 0,
+            "cache": 0,
+            "router": 0,
+            "low_confidence": 0,
+        }
+
+        # Serialises access to the routing cache and model across threads
+        self._lock = threading.Lock()
+
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self._pool = None
+        self._pool_size = 0
+
         self.vocab = load_vocab(vocab_path)
-        self.model = Router(vocab_size=len(self.vocab) + 1)
+        self.tokenizer = Tokenizer(self.vocab)
+        self._model = None
+
+    @property
+    def model(self) -> "Module":
+        """
+        The router model. It is loaded on first use, so that torch is only imported once
+        an integrand actually needs the neural router.
+        """
+        if self._model is None:
+            self._model = self.load_model()
+        return self._model
+
+    def load_model(self) -> "Module":
+        """Load the exported runtime router if one is given, else the eager Router."""
+        # Imported here, as torch takes seconds to import
+        import torch
+
+        from neuralsutra.router import Router
+        from neuralsutra.runtime import load_router
 
-        # Load the trained model (.pth) file
-        self.model.load_state_dict(torch.load(model_path))
-        self.model.eval()
+        if self.runtime_path is not None:
+            try:
+                return load_router(self.runtime_path)
+            except Exception as e:
+                warnings.warn(
+                    f"Could not load exported router '{self.runtime_path}' ({e}), "
+                    "falling back to the eager model."
+                )
+
+        if self.mmap:
+            # Build the model on the meta device, without allocating or initialising
+            # weights, and adopt the mapped tensors as its parameters
+            model = Router(vocab_size=len(self.vocab) + 1, device="meta")
+            state = torch.load(self.model_path, mmap=True, weights_only=True)
+            model.load_state_dict(state, assign=True)
+            return model.eval()
+
+        model = Router(vocab_size=len(self.vocab) + 1)
+
+        if self.quantized:
+            from neuralsutra.trainer import quantize_model
+
+            # Quantized weights hold packed parameters, which are not plain tensors
+            model = quantize_model(model)
+            model.load_state_dict(torch.load(self.model_path, weights_only=False))
+        else:
+            # Load the trained model (.pth) file
+            model.load_state_dict(torch.load(self.model_path))
+
+        return model.eval()
+
+    def __enter__(self) -> "Compiler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one has been started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def worker_options(self) -> dict:
+        """Return the constructor options passed on to the compilers of worker processes."""
+        return {
+            "cache_size": self.cache.capacity,
+            "abstract_coefficients": self.abstract_coefficients,
+            "runtime_path": self.runtime_path,
+            "quantized": self.quantized,
+            "prerouter": self.prerouter,
+            "confidence_threshold": self.confidence_threshold,
+            "max_length": self.max_length,
+            "mmap": self.mmap,
+        }
+
+    def pool(self, workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Return the persistent worker pool, starting it on first use (or restarting it if
+        a different number of workers is requested).
+        """
+        workers = workers or self.workers
+        if self._pool is not None and self._pool_size != workers:
+            self.close()
+
+        if self._pool is None:
+            # Spawn (rather than fork) workers, so that they do not inherit torch's threads
+            self._pool_size = workers
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.model_path, self.vocab_path, self.worker_options()),
+            )
+        return self._pool
+
+    def encode(self, node: Expr) -> "Tensor":
+        """Convert a SymPy node to a 1-D tensor of vocabulary token IDs."""
+        import torch
+
+        return torch.tensor(self.tokenizer.encode(node, self.max_length))
 
     def predict(self, node: Expr) -> int:
         """
         Convert a SymPy node to a symbolic expression token sequence and
         predict the best Vedic sutra for the task.
         """
-        # Add padding parentheses to the tokens
-        tokens = srepr(node).replace("(", " ( ").replace(")", " ) ").split()
-        ids = torch.tensor([[self.vocab.get(t, 0) for t in tokens]])
+        return self.predict_batch([node])[0]
 
-        with torch.no_grad():
-            output = self.model(ids)
-            return torch.argmax(output, dim=1).item()
+    def predict_batch(self, nodes: list[Expr]) -> list[int]:
+        """
+        Predict the best Vedic sutra for several SymPy nodes using a single forward
+        pass of the router model.
 
-    def transform(self, node: Expr, var: Symbol) -> Expr:
+        Structurally unambiguous nodes are classified by the rule-based pre-router, and
+        nodes found in the routing cache are not routed again. The token sequences of the
+        remaining nodes are padded into one batch and passed with their lengths, so that
+        the router skips the padding and each node gets the same intent as when it is
+        routed alone.
+        """
+        intents = [None] * len(nodes)
+        keys = [None] * len(nodes)
+        pending = {}
+
+        with self._lock:
+            for i, node in enumerate(nodes):
+                if self.prerouter:
+                    intents[i] = classify(node)
+                    if intents[i] is not None:
+                        self.route_counts["prerouter"] += 1
+                        continue
+
+                key = keys[i] = structural_key(node, self.abstract_coefficients)
+                if key in pending:
+                    continue
+
+                intents[i] = self.cache.get(key)
+                if intents[i] is None:
+                    pending[key] = node
+                else:
+                    self.route_counts["cache"] += 1
+
+            if pending:
+                import torch
+                from torch.nn.utils.rnn import pad_sequence
+
+                # The router skips the padding of each sequence, given its length, so
+                # that the intent of a node does not depend on the rest of its batch
+                seqs = [self.encode(n) for n in pending.values()]
+                ids = pad_sequence(seqs, batch_first=True)
+                lengths = torch.tensor([len(seq) for seq in seqs])
+
+                with torch.no_grad():
+                    probs = torch.softmax(self.model(ids, lengths), dim=1)
+                    confidence, predicted = probs.max(dim=1)
+
+                for key, conf, intent in zip(
+                    pending, confidence.tolist(), predicted.tolist()
+                ):
+                    self.route_counts["router"] += 1
+
+                    # Leave integrands the router is unsure about to SymPy
+                    if conf < self.confidence_threshold:
+                        intent = 0
+                        self.route_counts["low_confidence"] += 1
+
+                    pending[key] = intent
+                    self.cache.put(key, intent)
+
+        return [
+            pending[key] if intent is None else intent
+            for key, intent in zip(keys, intents)
+        ]
+
+    def transform(self, node: Expr, var: Symbol, intent: Optional[int] = None) -> Expr:
         """
         Apply a surgical transformation to each SymPy Integral node.
+
+        If the intent has already been predicted (e.g. by a batched routing pass),
+        it is used directly instead of querying the router again.
         """
         if isinstance(node, Integral):
             integrand = node.function
 
             # Query the neural Router for the mathematical intent
-            intent = self.predict(integrand)
+            if intent is None:
+                intent = self.predict(integrand)
 
             if intent == 1:
-                # If there are multiple factors, reduce them recursively
-                if integrand.is_Mul:
-                    factors = list(integrand.args)
-
-                    def recursive_multiply(args):
-                        if len(args) == 1:
-                            return args[0]
-
-                        head = Engine.multiply(args[0] * args[1], var)
-
-                        # Recurse with the new result and the remaining factors
-                        return recursive_multiply([head] + args[2:])
+                # Pure polynomials are multiplied and integrated on their coefficients
+                if integrand.is_polynomial(var):
+                    return Engine.integrate_polynomial(integrand, var)
 
-                    mul_res = recursive_multiply(factors)
+                # If there are multiple factors, reduce them with a balanced product tree
+                if integrand.is_Mul:
+                    mul_res = Engine.multiply(integrand, var)
                 else:
                     mul_res = integrand
 
                 # Re-wrap in Integral and resolve
                 return Integral(mul_res, var).doit()
             elif intent == 2:
-                # Divide using division kernel
-                div_res = Engine.divide(integrand, var)
-
-                return Integral(div_res, var).doit()
+                # Divide using the division kernel and integrate the partial fractions
+                return Engine.integrate_rational(integrand, var)
             elif intent == 3:
                 int_res = Engine.integrate(integrand, var)
 
@@ -78,10 +321,21 @@ class Compiler:
 
         return node
 
-    def compile(self, expr: Expr, var: Symbol, max_passes: int = 10) -> Expr:
+    def compile(
+        self,
+        expr: Expr,
+        var: Symbol,
+        max_passes: int = 10,
+        batched: bool = False,
+        router: Optional[Callable[[list[Expr]], list[int]]] = None,
+    ) -> Expr:
         """
         Recursively apply sutras until the expression converges (no Integral nodes left)
         or the structure stabilises (fixed-point iteration).
+
+        If batched is True, every Integral node in a pass is routed with one forward
+        pass of the router model before the kernels are dispatched. The integrands are
+        routed by router if given (e.g. a micro-batching front-end), or predict_batch.
         """
         # Convert floats to rationals
         expr = nsimplify(sympify(expr), rational=True)
@@ -89,6 +343,116 @@ class Compiler:
         # Wrap the expression in an Integral object and expand addition only
         current_task = Integral(expr, var).expand(mul=False, multinomial=False)
 
+        # Independent additive terms are sharded across the worker pool
+        if (
+            self.workers > 0
+            and current_task.is_Add
+            and len(current_task.args) >= self.parallel_threshold
+        ):
+            terms = current_task.args
+            chunksize = max(1, len(terms) // (4 * self.workers))
+            results = self.pool().map(
+                solve_task,
+                terms,
+                [var] * len(terms),
+                [max_passes] * len(terms),
+                [batched] * len(terms),
+                chunksize=chunksize,
+            )
+
+            # Results are returned in the order of the terms
+            return Add(*results)
+
+        return self.solve(
+            current_task, var, max_passes=max_passes, batched=batched, router=router
+        )
+
+    def compile_many(
+        self,
+        exprs: Iterable[Expr],
+        var: Symbol,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+        max_passes: int = 10,
+        batched: bool = False,
+    ) -> Iterator[CompileResult]:
+        """
+        Compile a stream of expressions, yielding a CompileResult for each one, either in
+        input order or as soon as it completes.
+
+        The expressions are compiled by the persistent worker pool (defaulting to the
+        compiler's own number of workers), whose processes keep their router model warm
+        between calls. With no workers, they are compiled in this process. Each item is
+        limited to timeout seconds of compilation, and any failure (including a timeout)
+        is returned in the error field of its result instead of being raised.
+        """
+        workers = self.workers if workers is None else workers
+
+        if workers <= 0:
+            # Load torch and the router before any item's time limit starts, as an import
+            # interrupted by the timeout would leave torch half-initialised
+            self.model
+
+            for index, expr in enumerate(exprs):
+                yield run_item(self, index, expr, var, max_passes, batched, timeout)
+            return
+
+        pool = self.pool(workers)
+        items = enumerate(exprs)
+
+        # Bound the number of in-flight items, so that long streams use constant memory
+        window = 4 * workers
+        pending = deque()
+
+        def submit() -> bool:
+            for index, expr in items:
+                future = pool.submit(
+                    compile_item, index, expr, var, max_passes, batched, timeout
+                )
+                pending.append((future, index, expr))
+                return True
+            return False
+
+        def collect(future, index: int, expr: Expr) -> CompileResult:
+            try:
+                return future.result()
+            except Exception as e:
+                # The worker itself failed (e.g. the process died)
+                return CompileResult(index, expr, None, e)
+
+        while len(pending) < window and submit():
+            pass
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(
+                    [f for f, _, _ in pending], return_when=FIRST_COMPLETED
+                )
+                done = [item for item in pending if item[0] in finished]
+                for item in done:
+                    pending.remove(item)
+
+            for item in done:
+                yield collect(*item)
+                submit()
+
+    def solve(
+        self,
+        task: Expr,
+        var: Symbol,
+        max_passes: int = 10,
+        batched: bool = False,
+        router: Optional[Callable[[list[Expr]], list[int]]] = None,
+    ) -> Expr:
+        """
+        Apply transformation passes to a task containing Integral nodes until it converges
+        or reaches a fixed point.
+        """
+        route = router or self.predict_batch
+        current_task = task
         last_state = None
         iterations = 0
 
@@ -98,9 +462,17 @@ class Compiler:
 
             last_state = current_task
 
+            intents = {}
+            if batched:
+                # Route all Integral nodes of this pass together
+                nodes = list(current_task.atoms(Integral))
+                integrands = [n.function for n in nodes]
+                intents = dict(zip(nodes, route(integrands)))
+
             # The replace method handles the tree walking
             current_task = current_task.replace(
-                lambda n: isinstance(n, Integral), lambda n: self.transform(n, var)
+                lambda n: isinstance(n, Integral),
+                lambda n: self.transform(n, var, intents.get(n)),
             )
             iterations += 1
 
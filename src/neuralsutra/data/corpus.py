@@ -0,0 +1,223 @@
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import torch
+from torch import Tensor
+from torch.nn.utils.rnn import pad_sequence
+from torch.utils.data import Dataset, Sampler
+
+from neuralsutra.tokenizer import Tokenizer
+
+# File names of the token buffer, sample offsets and labels within a corpus directory
+CORPUS_FILES = ("tokens.npy", "offsets.npy", "labels.npy")
+
+
+class TokenCorpus(Dataset):
+    """
+    Tokenized dataset stored as a flat int32 token buffer, the offset of each sample in
+    the buffer (one more offset than samples) and an int8 label per sample.
+
+    A corpus written by write_corpus is loaded with TokenCorpus.load, which memory-maps
+    the arrays so that datasets larger than RAM can be trained on without re-tokenizing.
+    """
+
+    def __init__(
+        self,
+        tokens: np.ndarray,
+        offsets: np.ndarray,
+        labels: np.ndarray,
+        path: Optional[str] = None,
+    ) -> None:
+        self.tokens = tokens
+        self.offsets = offsets
+        self.labels = labels
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str) -> "TokenCorpus":
+        """Memory-map the corpus stored in the directory path."""
+        arrays = (np.load(os.path.join(path, n), mmap_mode="r") for n in CORPUS_FILES)
+        return cls(*arrays, path=path)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of tokens in each sample."""
+        return np.diff(self.offsets)
+
+    def __reduce__(self) -> tuple:
+        # DataLoader workers re-map a loaded corpus instead of receiving a copy of it
+        if self.path is not None:
+            return TokenCorpus.load, (self.path,)
+        return TokenCorpus, (self.tokens, self.offsets, self.labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, index: int) -> tuple[Tensor, int]:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        ids = torch.from_numpy(self.tokens[start:end].astype(np.int64))
+        return ids, int(self.labels[index])
+
+
+class BucketBatchSampler(Sampler[list[int]]):
+    """
+    Batch sampler that groups samples of similar length so that batches need little
+    padding. The samples are shuffled and split into pools of pool_size batches; each
+    pool is sorted by length and cut into batches, and the batches are shuffled.
+    Without shuffle, the batches are in order of length within each pool.
+
+    Small pools keep the batches varied enough for training to converge as quickly per
+    epoch as with unsorted batches.
+    """
+
+    def __init__(
+        self,
+        lengths: np.ndarray,
+        batch_size: int = 32,
+        pool_size: int = 8,
+        shuffle: bool = True,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return -(-len(self.lengths) // self.batch_size)
+
+    def __iter__(self) -> Iterator[list[int]]:
+        n = len(self.lengths)
+        order = self.rng.permutation(n) if self.shuffle else np.arange(n)
+        pool = self.batch_size * self.pool_size
+
+        batches = []
+        for start in range(0, n, pool):
+            chunk = order[start : start + pool]
+
+            # Lengths are compared in steps of 16 tokens so that batches still mix
+            # expressions of different classes with similar lengths
+            chunk = chunk[np.argsort(self.lengths[chunk] // 16, kind="stable")]
+            batches.extend(
+                chunk[i : i + self.batch_size]
+                for i in range(0, len(chunk), self.batch_size)
+            )
+
+        if self.shuffle:
+            batches = [batches[i] for i in self.rng.permutation(len(batches))]
+
+        for batch in batches:
+            yield batch.tolist()
+
+
+def collate(batch: list[tuple[Tensor, int]]) -> tuple[Tensor, Tensor]:
+    """Pad a batch of corpus samples to its longest sequence for a DataLoader."""
+    ids = pad_sequence([ids for ids, _ in batch], batch_first=True)
+    labels = torch.tensor([label for _, label in batch])
+    return ids, labels
+
+
+def encode_chunks(
+    dataset: Iterable[tuple[str, int]],
+    vocab: dict[str, int],
+    max_length: Optional[int] = None,
+    chunk_size: int = 100_000,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Tokenize a dataset of (srepr string, label) pairs, truncating each sequence to
+    max_length. Yields the (tokens, lengths, labels) arrays of chunk_size samples at a
+    time.
+    """
+    tokenizer = Tokenizer(vocab)
+    ids, labels = [], []
+
+    for s_expr, label in dataset:
+        ids.append(tokenizer.encode_string(s_expr)[:max_length])
+        labels.append(label)
+
+        if len(labels) == chunk_size:
+            yield _pack(ids, labels)
+            ids, labels = [], []
+
+    if labels:
+        yield _pack(ids, labels)
+
+
+def _pack(
+    ids: list[np.ndarray], labels: list[int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate the sequences of a chunk into flat arrays."""
+    lengths = np.array([len(seq) for seq in ids], dtype=np.int64)
+    return (
+        np.concatenate(ids).astype(np.int32),
+        lengths,
+        np.array(labels, dtype=np.int8),
+    )
+
+
+def encode_corpus(
+    dataset: Iterable[tuple[str, int]],
+    vocab: dict[str, int],
+    max_length: Optional[int] = None,
+) -> TokenCorpus:
+    """Tokenize a dataset of (srepr string, label) pairs into an in-memory corpus."""
+    chunks = list(encode_chunks(dataset, vocab, max_length))
+    tokens, lengths, labels = (np.concatenate(arrays) for arrays in zip(*chunks))
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    return TokenCorpus(tokens, offsets, labels)
+
+
+def write_corpus(
+    dataset: Iterable[tuple[str, int]],
+    vocab: dict[str, int],
+    path: str,
+    max_length: Optional[int] = None,
+    chunk_size: int = 100_000,
+) -> int:
+    """
+    Tokenize a dataset of (srepr string, label) pairs once and write it to the directory
+    path as .npy files that TokenCorpus.load can memory-map. The dataset may be a
+    generator: it is streamed in chunks of chunk_size samples, so only the offsets and
+    labels are held in memory. Returns the number of samples written.
+    """
+    os.makedirs(path, exist_ok=True)
+    lengths, labels = [], []
+
+    # Stream the token buffer to a raw file, as its final size is not known up front
+    with tempfile.TemporaryFile(dir=path) as raw:
+        for chunk_tokens, chunk_lengths, chunk_labels in encode_chunks(
+            dataset, vocab, max_length, chunk_size
+        ):
+            chunk_tokens.tofile(raw)
+            lengths.append(chunk_lengths)
+            labels.append(chunk_labels)
+
+        lengths = np.concatenate(lengths)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Copy the raw buffer into a .npy file chunk by chunk
+        tokens = np.lib.format.open_memmap(
+            os.path.join(path, CORPUS_FILES[0]),
+            mode="w+",
+            dtype=np.int32,
+            shape=(int(offsets[-1]),),
+        )
+        raw.seek(0)
+        step = 1 << 24
+        for start in range(0, len(tokens), step):
+            block = np.fromfile(raw, dtype=np.int32, count=step)
+            tokens[start : start + len(block)] = block
+        tokens.flush()
+        del tokens
+
+    np.save(os.path.join(path, CORPUS_FILES[1]), offsets)
+    np.save(os.path.join(path, CORPUS_FILES[2]), np.concatenate(labels))
+
+    return len(lengths)
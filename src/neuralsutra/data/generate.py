@@ -1,4 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing
+import os
 import random
+from types import ModuleType
+from typing import Iterable, Iterator, Optional, Union
+
 from sympy import (
     cos,
     sin,
@@ -17,82 +24,215 @@ from sympy import (
     Expr,
 )
 
+from neuralsutra.tokenizer import split_srepr, summarize
+
 x = Symbol("x")
 
+# Maximum degree and coefficient size of the polynomials in large samples
+LARGE_DEGREE = 200
+LARGE_COEFF = 10**8
+
 
-def generate_dataset(samples_per_class: int = 2000) -> list[tuple[str, int]]:
+def generate_samples(
+    samples_per_class: int,
+    rng: Union[random.Random, ModuleType] = random,
+    max_length: Optional[int] = None,
+    large_fraction: float = 0.0,
+) -> Iterator[tuple[str, int]]:
     """
-    Generate a synthetic dataset of SymPy AST sequences.
-    Classes:
-    0: Fallback (Simple polynomials, elementary non-integrable)
-    1: Multiply (Polynomial * Polynomial)
-    2: Divide (Rational expressions / Polynomial Division)
-    3: Integrate (Polynomial * Transcendental - Integration by Parts style)
+    Yield samples_per_class synthetic samples of each class (see generate_dataset), one
+    sample of each class in turn, drawing from rng (by default the global random state).
     """
-    dataset = []
-
-    print(f"Generating {samples_per_class * 4} samples...\n")
 
-    def get_coeff(allow_negative: bool = True) -> Rational:
+    def get_coeff(allow_negative: bool = True, large: bool = False) -> Rational:
         """Return a random fractional coefficient."""
-        num = random.randint(1, 10)
-        if allow_negative and random.random() > 0.5:
+        num = rng.randint(1, LARGE_COEFF if large else 10)
+        if allow_negative and rng.random() > 0.5:
             num *= -1
-        den = random.randint(1, 5)
+        den = rng.randint(1, 5)
         return Rational(num, den)
 
-    def get_poly(max_degree: int = 3, min_terms: int = 1) -> Add:
+    def get_poly(max_degree: int = 3, min_terms: int = 1, large: bool = False) -> Add:
         """Generate a random polynomial."""
-        num_terms = random.randint(min_terms, max_degree + 1)
-        degrees = random.sample(range(max_degree + 1), num_terms)
-        return Add(*[get_coeff() * x**d for d in degrees], evaluate=False)
+        if large:
+            max_degree = rng.randint(max_degree, LARGE_DEGREE)
+        num_terms = rng.randint(min_terms, max_degree + 1)
+        degrees = rng.sample(range(max_degree + 1), num_terms)
+        return Add(*[get_coeff(large=large) * x**d for d in degrees], evaluate=False)
+
+    def sample(expr: Expr) -> str:
+        """Serialize an expression, summarizing it if it is longer than max_length."""
+        s_expr = srepr(expr)
+        if max_length is not None and len(split_srepr(s_expr)) > max_length:
+            s_expr = srepr(summarize(expr))
+        return s_expr
 
     def get_transcendental() -> Expr:
         """Return a randomly chosen transcendental function."""
-        f = random.choice([sin, cos, exp, tan, sinh, cosh, tanh])
+        f = rng.choice([sin, cos, exp, tan, sinh, cosh, tanh])
         # Use simple linear arguments for integration logic
-        return f(random.choice([1, -1, 2, -2]) * x)
+        return f(rng.choice([1, -1, 2, -2]) * x)
 
     for _ in range(samples_per_class):
+        # Only draw when needed, so that seeded datasets without large samples are unchanged
+        large = large_fraction > 0 and rng.random() < large_fraction
+
         # Class 0: Fallback
-        expr_0 = random.choice(
+        expr_0 = rng.choice(
             [
-                get_poly(max_degree=2),
+                get_poly(max_degree=2, large=large),
                 log(abs(get_coeff() * x + get_coeff())),
-                random.choice([sin, cos])(x**2),
+                rng.choice([sin, cos])(x**2),
                 exp(x) / x,
                 get_coeff() * x,
             ]
         )
-        dataset.append((srepr(expr_0), 0))
+        yield sample(expr_0), 0
 
         # Class 1: Multiplication
-        p1 = get_poly(max_degree=4, min_terms=2)
-        p2 = get_poly(max_degree=3, min_terms=2)
-        dataset.append((srepr(Mul(p1, p2, evaluate=False)), 1))
+        p1 = get_poly(max_degree=4, min_terms=2, large=large)
+        p2 = get_poly(max_degree=3, min_terms=2, large=large)
+        yield sample(Mul(p1, p2, evaluate=False)), 1
 
         # Class 2: Division
-        num_poly = get_poly(max_degree=3, min_terms=1)
+        num_poly = get_poly(max_degree=3, min_terms=1, large=large)
         den_poly = get_poly(max_degree=1, min_terms=2)
 
         # Use evaluate=False to keep the fractional structure in the AST
         div_expr = Mul(num_poly, Pow(den_poly, -1, evaluate=False), evaluate=False)
-        dataset.append((srepr(div_expr), 2))
+        yield sample(div_expr), 2
 
         # Class 3: Integration
-        p_a = get_poly(max_degree=3, min_terms=1)
+        p_a = get_poly(max_degree=3, min_terms=1, large=large)
         trans = get_transcendental()
 
         # Generate double and triple bracket scenarios
-        if random.random() > 0.7:
+        if rng.random() > 0.7:
             expr_3 = Mul(get_poly(max_degree=1), p_a, trans, evaluate=False)
         else:
             expr_3 = Mul(p_a, trans, evaluate=False)
 
-        dataset.append((srepr(expr_3), 3))
+        yield sample(expr_3), 3
+
 
+def generate_dataset(
+    samples_per_class: int = 2000,
+    max_length: Optional[int] = None,
+    large_fraction: float = 0.0,
+) -> list[tuple[str, int]]:
+    """
+    Generate a synthetic dataset of SymPy AST sequences.
+    Classes:
+    0: Fallback (Simple polynomials, elementary non-integrable)
+    1: Multiply (Polynomial * Polynomial)
+    2: Divide (Rational expressions / Polynomial Division)
+    3: Integrate (Polynomial * Transcendental - Integration by Parts style)
+
+    A large_fraction of the samples use polynomials of up to LARGE_DEGREE with large
+    coefficients. Samples longer than max_length tokens are summarized in the same way
+    as the Compiler summarizes them for routing (see tokenizer.summarize).
+
+    The whole dataset is held in memory; see generate_shards for large datasets.
+    """
+    print(f"Generating {samples_per_class * 4} samples...\n")
+
+    dataset = list(
+        generate_samples(samples_per_class, random, max_length, large_fraction)
+    )
     random.shuffle(dataset)
 
     print(f"Successfully generated {len(dataset)} samples.\n")
 
     return dataset
+
+
+def write_shard(
+    path: str,
+    samples_per_class: int,
+    seed: str,
+    max_length: Optional[int] = None,
+    large_fraction: float = 0.0,
+    chunk_size: int = 10_000,
+) -> int:
+    """
+    Generate a shard of the dataset from its own seed and stream it to path, one
+    tab-separated srepr string and label per line, writing chunk_size lines at a time.
+    Returns the number of samples written.
+    """
+    rng = random.Random(seed)
+    samples = generate_samples(samples_per_class, rng, max_length, large_fraction)
+    count = 0
+
+    with open(path, "w") as f:
+        while chunk := list(islice(samples, chunk_size)):
+            f.writelines(f"{s_expr}\t{label}\n" for s_expr, label in chunk)
+            count += len(chunk)
+
+    return count
+
+
+def generate_shards(
+    path: str,
+    samples_per_class: int = 2000,
+    shards: int = 64,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    max_length: Optional[int] = None,
+    large_fraction: float = 0.0,
+) -> list[str]:
+    """
+    Generate a synthetic dataset (see generate_dataset) in parallel, as shard files in
+    the directory path, and return their paths.
+
+    The samples are split evenly over the shards, and each shard is generated from its
+    own seed (derived from seed and the shard number) by one of workers processes, so
+    the dataset only depends on seed and shards, not on the number of workers. Shards
+    are streamed to disk, so memory use does not grow with the size of the dataset.
+    Shuffle the samples when loading them with load_shards.
+    """
+    os.makedirs(path, exist_ok=True)
+    paths = [os.path.join(path, f"shard-{i:05d}.tsv") for i in range(shards)]
+
+    # Spread the remainder over the first shards
+    base, extra = divmod(samples_per_class, shards)
+    sizes = [base + (i < extra) for i in range(shards)]
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(write_shard, p, size, f"{seed}/{i}", max_length, large_fraction)
+            for i, (p, size) in enumerate(zip(paths, sizes))
+        ]
+        count = sum(f.result() for f in futures)
+
+    print(f"Successfully generated {count} samples in {shards} shards.\n")
+
+    return paths
+
+
+def load_shards(
+    paths: Iterable[str], buffer_size: int = 100_000, seed: Optional[int] = None
+) -> Iterator[tuple[str, int]]:
+    """
+    Stream the (srepr string, label) samples of dataset shard files, shuffled through a
+    buffer of buffer_size samples so that only the buffer is held in memory.
+    """
+    rng = random.Random(seed)
+    paths = list(paths)
+    rng.shuffle(paths)
+    buffer = []
+
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                s_expr, label = line.rstrip("\n").split("\t")
+                buffer.append((s_expr, int(label)))
+
+                if len(buffer) >= buffer_size:
+                    # Emit a random sample, replacing it with the last one
+                    i = rng.randrange(len(buffer))
+                    buffer[i], buffer[-1] = buffer[-1], buffer[i]
+                    yield buffer.pop()
+
+    rng.shuffle(buffer)
+    yield from buffer
@@ -2,7 +2,8 @@ from sympy import Expr, Symbol
 
 from neuralsutra.kernels.multiply import multiply
 from neuralsutra.kernels.divide import divide
-from neuralsutra.kernels.integrate import integrate
+from neuralsutra.kernels.integrate import integrate, integrate_polynomial
+from neuralsutra.kernels.rational import integrate_rational
 
 
 class Engine:
@@ -19,3 +20,11 @@ class Engine:
     @staticmethod
     def integrate(expr: Expr, var: Symbol) -> Expr:
         return integrate(expr, var)
+
+    @staticmethod
+    def integrate_rational(expr: Expr, var: Symbol) -> Expr:
+        return integrate_rational(expr, var)
+
+    @staticmethod
+    def integrate_polynomial(expr: Expr, var: Symbol) -> Expr:
+        return integrate_polynomial(expr, var)
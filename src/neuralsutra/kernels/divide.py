@@ -1,4 +1,64 @@
-from sympy import Expr, Poly, Rational, Symbol, simplify
+from sympy import Expr, Symbol, simplify
+
+from neuralsutra.kernels.poly import Coeff, CoeffPoly, div
+
+
+def synthetic(num: CoeffPoly, root: Coeff) -> tuple[list[Coeff], Coeff]:
+    """
+    Divide a coefficient polynomial by (x - root) using Horner's synthetic division,
+    returning the quotient coefficients and the remainder.
+    """
+    acc = 0
+    res = []
+    for c in num.coeffs:
+        acc = acc * root + c
+        res.append(acc)
+
+    return res[:-1], res[-1]
+
+
+def paravartya(num: CoeffPoly, den: CoeffPoly) -> tuple[CoeffPoly, CoeffPoly]:
+    """
+    Divide two coefficient polynomials using the Paravartya Yojayet (Transpose and Apply)
+    method, returning the quotient and the remainder.
+    """
+    if num.degree < den.degree:
+        return CoeffPoly([0]), num
+
+    d_coeffs = den.coeffs
+    leading_coeff = d_coeffs[0]
+
+    # Linear divisors reduce to a single Horner pass with the transposed constant
+    if den.degree == 1:
+        q_coeffs, r = synthetic(num, div(-d_coeffs[1], leading_coeff))
+        if leading_coeff != 1:
+            inv = div(1, leading_coeff)
+            q_coeffs = [c * inv for c in q_coeffs]
+        return CoeffPoly(q_coeffs), CoeffPoly([r])
+
+    # Compute the transformed coefficients for division (transpose)
+    div_trans = [-c for c in d_coeffs[1:]]
+
+    # Multiply by the reciprocal of the leading coefficient, rather than dividing by it
+    # (monic divisors skip the normalisation entirely)
+    inv = None if leading_coeff == 1 else div(1, leading_coeff)
+
+    # Copy numerator coefficients to accumulate division result
+    res = list(num.coeffs)
+    t_len = len(div_trans)  # Length of the transposed denominator coefficients
+    split = len(res) - t_len
+
+    for i in range(split):
+        # Normalize the current column to get the actual quotient digit
+        digit = res[i] if inv is None else res[i] * inv
+        res[i] = digit
+
+        # Apply the normalized digit to the subsequent coefficients
+        if digit:
+            for j, t in enumerate(div_trans, i + 1):
+                res[j] += digit * t
+
+    return CoeffPoly(res[:split]), CoeffPoly(res[split:])
 
 
 def divide(expr: Expr, var: Symbol) -> Expr:
@@ -10,36 +70,10 @@ def divide(expr: Expr, var: Symbol) -> Expr:
         num, den = expr.as_numer_denom()
 
         # Convert the numerator and denominator into polynomial coefficients
-        n_coeffs = [Rational(c) for c in Poly(num, var).all_coeffs()]
-        d_coeffs = [Rational(c) for c in Poly(den, var).all_coeffs()]
-
-        leading_coeff = d_coeffs[0]
-
-        # Compute the transformed coefficients for division (transpose)
-        div_trans = [-Rational(c) for c in d_coeffs[1:]]
-
-        # Copy numerator coefficients to accumulate division result
-        res = list(n_coeffs)
-        t_len = len(
-            div_trans
-        )  # t_len is the length of the transposed denominator coefficients
-        n_len = len(n_coeffs)
-        split = n_len - t_len
-
-        for i in range(split):
-            # Normalize the current column by leading_coeff to get the actual quotient digit
-            res[i] = res[i] / leading_coeff
-
-            # Apply the normalized digit to the subsequent coefficients
-            if res[i] != 0:
-                for j in range(t_len):
-                    res[i + 1 + j] += res[i] * div_trans[j]
+        q, r = paravartya(CoeffPoly.from_expr(num, var), CoeffPoly.from_expr(den, var))
 
         # Reconstruct the quotient and remainder polynomials
-        q_poly = sum(res[i] * var ** (split - 1 - i) for i in range(split))
-        r_poly = sum(res[split + i] * var ** (t_len - 1 - i) for i in range(t_len))
-
-        return q_poly + (r_poly / den)
+        return q.to_expr(var) + (r.to_expr(var) / den)
     except Exception:
         # Revert to SymPy division as a safety fallback
         return simplify(expr)
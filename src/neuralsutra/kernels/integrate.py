@@ -1,4 +1,117 @@
-from sympy import Expr, Poly, S, Symbol, integrate as sympy_integrate
+import threading
+from typing import Optional
+
+from sympy import (
+    Add,
+    Expr,
+    Mul,
+    Symbol,
+    cos,
+    cosh,
+    exp,
+    integrate as sympy_integrate,
+    sin,
+    sinh,
+)
+
+from neuralsutra.cache import LRUCache
+from neuralsutra.kernels.multiply import product_tree
+from neuralsutra.kernels.poly import CoeffPoly, div, to_sympy
+
+# Successive antiderivatives of f(a*x + b), as (sign, function) pairs: the k-th antiderivative
+# is sign * function(a*x + b) / a^k, with k taken modulo the period of the cycle.
+ANTIDERIVATIVE_CYCLES = {
+    sin: [(1, sin), (-1, cos), (-1, sin), (1, cos)],
+    cos: [(1, cos), (1, sin), (-1, cos), (-1, sin)],
+    exp: [(1, exp)],
+    sinh: [(1, sinh), (1, cosh)],
+    cosh: [(1, cosh), (1, sinh)],
+}
+
+# Process-wide cache of the successive antiderivatives of transcendental factors outside
+# the closed-form families, keyed by (v, var)
+ANTIDERIVATIVE_CACHE = LRUCache(capacity=256)
+_antiderivative_lock = threading.Lock()
+
+
+def _antiderivative_multipliers(v: Expr, var: Symbol, count: int) -> list[Expr]:
+    """
+    Return the multipliers V_k / v of the first count successive antiderivatives V_k of v,
+    computing (and caching) only the rows that have not been seen before.
+    """
+    key = (v, var)
+    with _antiderivative_lock:
+        rows = ANTIDERIVATIVE_CACHE.get(key, ())
+
+    if len(rows) < count:
+        # Extend a private copy so that concurrent callers never share a partial row list
+        extended = list(rows)
+        while len(extended) < count:
+            # Integrate the transcendental part for the next row
+            curr_v_integral = sympy_integrate(extended[-1][0] if extended else v, var)
+
+            # Compute multiplier for this row
+            extended.append((curr_v_integral, (curr_v_integral / v).simplify()))
+
+        rows = tuple(extended)
+        with _antiderivative_lock:
+            ANTIDERIVATIVE_CACHE.put(key, rows)
+
+    return [multiplier for _, multiplier in rows[:count]]
+
+
+def _integrate_closed_form(u: CoeffPoly, v: Expr, var: Symbol) -> Optional[Expr]:
+    """
+    Fill the Urdhva table for u * v with coefficient arithmetic only, when v is one of the
+    functions in ANTIDERIVATIVE_CYCLES with a linear argument. Returns None otherwise.
+    """
+    cycle = ANTIDERIVATIVE_CYCLES.get(v.func)
+    if cycle is None:
+        return None
+
+    arg = v.args[0]
+    try:
+        inner = CoeffPoly.from_expr(arg, var)
+    except Exception:
+        return None
+
+    if inner.degree != 1:
+        return None
+
+    # Each row of the table contributes (-1)^k * u^(k) * V_(k+1), where V_(k+1) is a
+    # signed cycle function scaled by 1/a^(k+1)
+    inv_a = div(1, inner.coeffs[0])
+    scale = inv_a
+    accumulators = {func: [0] * (u.degree + 1) for _, func in cycle}
+
+    curr_u = u  # Current row of coefficients in the table
+    offset = 0  # Offset to place coefficients correctly in the accumulators
+    sign = 1  # Alternating sign
+
+    while not curr_u.is_zero:
+        cycle_sign, func = cycle[(offset + 1) % len(cycle)]
+        row_scale = sign * cycle_sign * scale
+        acc = accumulators[func]
+
+        for i, c in enumerate(curr_u.coeffs):
+            acc[offset + i] += row_scale * c
+
+        # Differentiate the coefficients for the next row
+        curr_u = curr_u.derivative()
+        offset += 1
+        scale *= inv_a
+        sign *= -1
+
+    # Build the expanded result once from the accumulated coefficients
+    degree = u.degree
+    return Add(
+        *[
+            Mul(to_sympy(c), var ** (degree - i), func(arg))
+            for func, acc in accumulators.items()
+            for i, c in enumerate(acc)
+            if c
+        ]
+    )
 
 
 def integrate(expr: Expr, var: Symbol) -> Expr:
@@ -10,56 +123,61 @@ def integrate(expr: Expr, var: Symbol) -> Expr:
         coeff, rest = expr.as_coeff_Mul()
 
         # Identify the polynomial part (u) and the transcendental part (v)
-        args = rest.args if rest.is_Mul else [rest]
-        poly_part = next(
-            (a for a in args if a.is_polynomial(var)), S.One
-        )  # polynomial part
-        v = rest / poly_part  # transcendental part
+        polys = []
+        others = []
+        for a in rest.args if rest.is_Mul else [rest]:
+            try:
+                polys.append(CoeffPoly.from_expr(a, var))
+            except Exception:
+                others.append(a)
+
+        u = product_tree(polys)  # polynomial part
+        v = Mul(*others)  # transcendental part
 
         # If no polynomial found (or u = 1), fallback to SymPy integration
-        if poly_part == S.One or not poly_part.has(var):
+        if u.degree < 1:
             return sympy_integrate(expr, var)
 
-        # Convert polynomial part into coefficients
-        p = Poly(poly_part, var)
-        u_coeffs = list(p.all_coeffs())
-        degree = p.degree()
+        # Closed-form table for the common transcendental families
+        res = _integrate_closed_form(u, v, var)
+        if res is not None:
+            return (coeff * res).expand()
+
+        multipliers = _antiderivative_multipliers(v, var, u.degree + 1)
 
-        # Initialize accumulator for the resulting polynomial
-        final_poly_coeffs = [S(0)] * (degree + 1)
-        curr_u = u_coeffs  # Current row of coefficients in the table
+        curr_u = u  # Current row of the table
         sign = 1  # Alternating sign
-        curr_v_integral = v  # Integral of the transcendental part
+        rows = []
 
         # Integrate recursively while differentiating coefficients
-        while curr_u:
-            # Integrate the transcendental part for this row
-            curr_v_integral = sympy_integrate(curr_v_integral, var)
-
-            # Compute multiplier for this row
-            multiplier = (curr_v_integral / v).simplify()
-
-            # Offset to place coefficients correctly in final polynomial
-            offset = (degree + 1) - len(curr_u)
-
-            # Add the current row of coefficients to the final accumulator
-            for i, c in enumerate(curr_u):
-                final_poly_coeffs[offset + i] += sign * c * multiplier
+        for multiplier in multipliers:
+            # Add the current row of coefficients, scaled by its multiplier
+            rows.append(sign * multiplier * curr_u.to_expr(var))
 
             # Differentiate the coefficients for the next row
-            new_u = []
-            for i, c in enumerate(curr_u[:-1]):
-                power = len(curr_u) - 1 - i
-                new_u.append(c * power)
-            curr_u = new_u
+            curr_u = curr_u.derivative()
 
             # Alternate the sign
             sign *= -1
 
-        # Reconstruct the polynomial from final coefficients and apply constant and transcendental part
-        res_poly = sum(c * var ** (degree - i) for i, c in enumerate(final_poly_coeffs))
+        # Apply the constant and transcendental part to the accumulated rows
+        return (coeff * Add(*rows) * v).expand()
+    except Exception:
+        # Revert to SymPy integration as a safety fallback
+        return sympy_integrate(expr, var)
+
+
+def integrate_polynomial(expr: Expr, var: Symbol) -> Expr:
+    """
+    Integrate a polynomial, or a product of polynomial factors, term by term on its
+    coefficients (c_k -> c_k / (k + 1)), building the SymPy expression only once.
+    """
+    try:
+        # Multiply the factors together on their coefficients first
+        factors = expr.args if expr.is_Mul else [expr]
+        u = product_tree([CoeffPoly.from_expr(f, var) for f in factors])
 
-        return (coeff * res_poly * v).expand()
-    except:
+        return u.antiderivative().to_expr(var)
+    except Exception:
         # Revert to SymPy integration as a safety fallback
         return sympy_integrate(expr, var)
@@ -1,31 +1,298 @@
-from sympy import Expr, Poly, Rational, Symbol
+from math import lcm
+
+from sympy import Expr, Mul, Symbol
+
+from neuralsutra.kernels.poly import Coeff, CoeffPoly, div
+
+# Use the sparse product when both factors have fewer non-zero coefficients than this
+SPARSE_DENSITY_THRESHOLD = 0.4
+
+# Length of the shorter dense factor at which the product switches from the schoolbook
+# convolution to Karatsuba, and from Karatsuba to the NTT.
+# These can be recalibrated for the host machine with `python -m scripts.calibrate`.
+KARATSUBA_THRESHOLD = 64
+NTT_THRESHOLD = 768
+
+# Primes of the form c * 2^32 + 1 with a primitive root, supporting NTTs of length up
+# to 2^32. Each prime adds ~62 bits to the coefficient range of the CRT reconstruction.
+NTT_PRIMES = [
+    (4611685941117976577, 3),
+    (4611685692009873409, 19),
+    (4611685606110527489, 3),
+    (4611685318347718657, 5),
+    (4611685232448372737, 3),
+    (4611685219563470849, 3),
+    (4611685125074190337, 5),
+    (4611685090714451969, 3),
+]
+
+
+def _convolve(a: list[Coeff], b: list[Coeff]) -> list[Coeff]:
+    """Schoolbook convolution of two coefficient lists."""
+    # Initialize the result array
+    res_coeffs = [0] * (len(a) + len(b) - 1)
+
+    # Perform polynomial multiplication using convolution
+    for i, ai in enumerate(a):
+        if not ai:
+            continue
+        for j, bj in enumerate(b):
+            res_coeffs[i + j] += ai * bj
+
+    return res_coeffs
+
+
+def _karatsuba(a: list[int], b: list[int]) -> list[int]:
+    """Karatsuba convolution of two integer coefficient lists."""
+    n, m = len(a), len(b)
+    if n < m:
+        a, b, n, m = b, a, m, n
+
+    if m < KARATSUBA_THRESHOLD:
+        return _convolve(a, b)
+
+    res = [0] * (n + m - 1)
+
+    # Unbalanced factors: multiply the longer one in chunks of the shorter length
+    if n >= 2 * m:
+        for start in range(0, n, m):
+            for i, c in enumerate(_karatsuba(a[start : start + m], b)):
+                res[start + i] += c
+        return res
+
+    # Split both factors at the same index: a = a0 + a1 * x^h, b = b0 + b1 * x^h
+    h = n // 2
+    a0, a1 = a[:h], a[h:]
+    b0, b1 = b[:h], b[h:]
+
+    z0 = _karatsuba(a0, b0)
+    z2 = _karatsuba(a1, b1)
+
+    # (a0 + a1)(b0 + b1) - z0 - z2 gives the cross terms with a single product
+    a01 = [u + v for u, v in zip(a1, a0 + [0] * (len(a1) - len(a0)))]
+    b01 = [u + v for u, v in zip(b1, b0 + [0] * (len(b1) - len(b0)))] + b0[len(b1) :]
+    z1 = _karatsuba(a01, b01)
+
+    for i, c in enumerate(z0):
+        res[i] += c
+        z1[i] -= c
+    for i, c in enumerate(z2):
+        res[i + 2 * h] += c
+        z1[i] -= c
+    for i, c in enumerate(z1):
+        res[i + h] += c
+
+    return res
+
+
+def _ntt(a: list[int], p: int, g: int, invert: bool = False) -> None:
+    """In-place iterative number theoretic transform of a power-of-two length list modulo p."""
+    n = len(a)
+
+    # Bit-reversal permutation
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            a[i], a[j] = a[j], a[i]
+
+    length = 2
+    while length <= n:
+        w = pow(g, (p - 1) // length, p)
+        if invert:
+            w = pow(w, p - 2, p)
+
+        half = length // 2
+        twiddles = [1] * half
+        for k in range(1, half):
+            twiddles[k] = twiddles[k - 1] * w % p
+
+        for start in range(0, n, length):
+            for k in range(start, start + half):
+                u = a[k]
+                v = a[k + half] * twiddles[k - start] % p
+                a[k] = (u + v) % p
+                a[k + half] = (u - v) % p
+
+        length <<= 1
+
+    if invert:
+        n_inv = pow(n, p - 2, p)
+        for i in range(n):
+            a[i] = a[i] * n_inv % p
+
+
+def _convolve_ntt(a: list[int], b: list[int]) -> list[int]:
+    """
+    Multi-modular NTT convolution of two integer coefficient lists, with the exact
+    coefficients recovered by CRT reconstruction.
+    """
+    res_len = len(a) + len(b) - 1
+    size = 1 << (res_len - 1).bit_length()
+
+    # Pick enough primes to cover the largest possible (signed) result coefficient
+    bound = 2 * max(map(abs, a)) * max(map(abs, b)) * min(len(a), len(b)) + 1
+    primes = []
+    modulus = 1
+    for p, g in NTT_PRIMES:
+        if modulus > bound:
+            break
+        primes.append((p, g))
+        modulus *= p
+
+    if modulus <= bound:
+        # Coefficients too large for the available primes
+        return _karatsuba(a, b)
+
+    res = [0] * res_len
+    modulus = 1
+
+    for p, g in primes:
+        fa = [c % p for c in a] + [0] * (size - len(a))
+        fb = [c % p for c in b] + [0] * (size - len(b))
+        _ntt(fa, p, g)
+        _ntt(fb, p, g)
+        fc = [u * v % p for u, v in zip(fa, fb)]
+        _ntt(fc, p, g, invert=True)
+
+        # Garner-style CRT: lift each residue from modulus to modulus * p
+        m_inv = pow(modulus, -1, p)
+        for i in range(res_len):
+            res[i] += modulus * ((fc[i] - res[i]) * m_inv % p)
+        modulus *= p
+
+    # Map the residues back to signed coefficients
+    half = modulus // 2
+    return [c - modulus if c > half else c for c in res]
+
+
+def _to_integers(p: CoeffPoly) -> tuple[list[int], int]:
+    """Scale a polynomial to integer coefficients by the common denominator."""
+    den = lcm(*(int(c.denominator) for c in p.coeffs))
+    return [int(c * den) for c in p.coeffs], den
+
+
+def _from_integers(coeffs: list[int], den: int) -> CoeffPoly:
+    """Divide integer coefficients back by the common denominator."""
+    if den == 1:
+        return CoeffPoly(coeffs)
+    return CoeffPoly([div(c, den) for c in coeffs])
+
+
+def urdhva(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+    """
+    Multiply two coefficient polynomials using the Urdhva Tiryagbhyam (Vertically and
+    Crosswise) convolution.
+    """
+    # Iterate over the sparser factor in the outer loop, so that more rows are skipped
+    if p1.density > p2.density:
+        p1, p2 = p2, p1
+
+    return CoeffPoly(_convolve(p1.coeffs, p2.coeffs))
+
+
+def karatsuba(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+    """
+    Multiply two coefficient polynomials using Karatsuba's divide-and-conquer method,
+    on integer coefficients scaled by their common denominators.
+    """
+    a, da = _to_integers(p1)
+    b, db = _to_integers(p2)
+    return _from_integers(_karatsuba(a, b), da * db)
+
+
+def ntt(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+    """
+    Multiply two coefficient polynomials using multi-modular number theoretic transforms,
+    on integer coefficients scaled by their common denominators.
+    """
+    a, da = _to_integers(p1)
+    b, db = _to_integers(p2)
+    return _from_integers(_convolve_ntt(a, b), da * db)
+
+
+def urdhva_sparse(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+    """
+    Multiply two coefficient polynomials by crossing only their non-zero terms, which
+    avoids touching the empty cells of the dense convolution for sparse factors.
+    """
+    res_terms = {}
+    t2 = p2.terms().items()
+
+    for e1, c1 in p1.terms().items():
+        for e2, c2 in t2:
+            e = e1 + e2
+            res_terms[e] = res_terms.get(e, 0) + c1 * c2
+
+    return CoeffPoly.from_terms(res_terms)
+
+
+def product(p1: CoeffPoly, p2: CoeffPoly) -> CoeffPoly:
+    """
+    Multiply two coefficient polynomials, choosing the engine based on the shape of the
+    factors: the sparse convolution for low-density factors, then schoolbook, Karatsuba
+    or NTT multiplication by increasing length of the shorter factor.
+    """
+    if max(p1.density, p2.density) < SPARSE_DENSITY_THRESHOLD:
+        return urdhva_sparse(p1, p2)
+
+    n = min(len(p1.coeffs), len(p2.coeffs))
+    if n < KARATSUBA_THRESHOLD:
+        return urdhva(p1, p2)
+    if n < NTT_THRESHOLD:
+        return karatsuba(p1, p2)
+
+    return ntt(p1, p2)
+
+
+def product_tree(polys: list[CoeffPoly]) -> CoeffPoly:
+    """
+    Multiply several coefficient polynomials by pairing them up level by level in a
+    balanced tree, so that each product combines factors of similar size.
+    """
+    if not polys:
+        return CoeffPoly([1])
+
+    # Pair factors of similar degree at the bottom of the tree
+    polys = sorted(polys, key=lambda p: p.degree)
+
+    while len(polys) > 1:
+        paired = [product(polys[i], polys[i + 1]) for i in range(0, len(polys) - 1, 2)]
+        if len(polys) % 2:
+            paired.append(polys[-1])
+        polys = paired
+
+    return polys[0]
 
 
 def multiply(expr: Expr, var: Symbol) -> Expr:
     """
     Perform exact polynomial multiplication using Urdhva Tiryagbhyam (Vertically and Crosswise) method.
+
+    All polynomial factors of the product are multiplied together on their coefficients,
+    while any remaining (non-polynomial) factors are distributed over the result.
     """
     try:
         # Extract the coefficients of the multiplicative arguments from the SymPy expression
-        p1_coeffs = Poly(expr.args[0], var).all_coeffs()
-        p2_coeffs = Poly(expr.args[1], var).all_coeffs()
+        polys = []
+        others = []
+        for factor in expr.args if expr.is_Mul else [expr]:
+            try:
+                polys.append(CoeffPoly.from_expr(factor, var))
+            except Exception:
+                others.append(factor)
 
-        n, m = len(p1_coeffs), len(p2_coeffs)
-
-        # Initialize the result array
-        res_len = n + m - 1
-        res_coeffs = [Rational(0)] * res_len
-
-        # Perform polynomial multiplication using convolution
-        for i in range(n):
-            for j in range(m):
-                res_coeffs[i + j] += p1_coeffs[i] * p2_coeffs[j]
-
-        # Compute the degree of the resulting polynomial
-        deg = res_len - 1
+        if not polys:
+            return expr.expand()
 
         # Reconstruct the symbolic polynomial expression
-        return sum(c * var ** (deg - i) for i, c in enumerate(res_coeffs))
+        res = product_tree(polys).to_expr(var)
+
+        return Mul(res, *others).expand() if others else res
 
     except Exception:
         # Revert to SymPy multiplication as a safety fallback
@@ -0,0 +1,152 @@
+from fractions import Fraction
+from typing import Union
+
+from sympy import Add, Expr, Integer, Mul, Poly, Rational, Symbol
+
+try:
+    # gmpy2 rationals are considerably faster than the standard library fractions
+    from gmpy2 import mpq as QQ
+except ImportError:
+    QQ = Fraction
+
+Coeff = Union[int, Fraction]
+
+
+def to_coeff(c: Expr) -> Coeff:
+    """Convert a SymPy Integer or Rational into a native int or rational coefficient."""
+    p, q = int(c.p), int(c.q)
+    return p if q == 1 else QQ(p, q)
+
+
+def to_sympy(c: Coeff) -> Expr:
+    """Convert a native int or rational coefficient into a SymPy Integer or Rational."""
+    if isinstance(c, int):
+        return Integer(c)
+
+    p, q = int(c.numerator), int(c.denominator)
+    return Integer(p) if q == 1 else Rational(p, q)
+
+
+def div(a: Coeff, b: Coeff) -> Coeff:
+    """Divide two native coefficients exactly, keeping integer results as int."""
+    if isinstance(a, int) and isinstance(b, int) and a % b == 0:
+        return a // b
+    return QQ(a) / b
+
+
+class CoeffPoly:
+    """
+    Compact univariate polynomial with exact int/rational coefficients, shared by the
+    Vedic kernels so that arithmetic happens on native numbers rather than SymPy objects.
+
+    Coefficients are stored densely with the leading coefficient first (the same order as
+    Poly.all_coeffs()). The zero polynomial is stored as [0].
+    """
+
+    __slots__ = ("coeffs",)
+
+    def __init__(self, coeffs: list[Coeff]) -> None:
+        # Strip leading zeros so that the degree is always len(coeffs) - 1
+        start = 0
+        while start < len(coeffs) - 1 and not coeffs[start]:
+            start += 1
+
+        self.coeffs = coeffs[start:] if coeffs else [0]
+
+    @classmethod
+    def from_terms(cls, terms: dict[int, Coeff]) -> "CoeffPoly":
+        """Build a polynomial from a sparse {exponent: coefficient} mapping."""
+        if not terms:
+            return cls([0])
+
+        degree = max(terms)
+        coeffs = [0] * (degree + 1)
+        for k, c in terms.items():
+            coeffs[degree - k] = c
+
+        return cls(coeffs)
+
+    @classmethod
+    def from_expr(cls, expr: Expr, var: Symbol) -> "CoeffPoly":
+        """
+        Convert a SymPy polynomial expression in var. Raises a ValueError if the
+        coefficients are not rational numbers.
+        """
+        p = Poly(expr, var)
+        domain = p.get_domain()
+
+        if not (domain.is_ZZ or domain.is_QQ):
+            raise ValueError(f"Coefficients over {domain} are not supported.")
+
+        return cls.from_terms({k: to_coeff(c) for (k,), c in p.terms()})
+
+    def to_expr(self, var: Symbol) -> Expr:
+        """Convert the polynomial back into a SymPy expression in var."""
+        degree = self.degree
+        terms = [
+            Mul(to_sympy(c), var ** (degree - i))
+            for i, c in enumerate(self.coeffs)
+            if c
+        ]
+
+        # A single Add call avoids the quadratic cost of summing the terms one by one
+        return Add(*terms)
+
+    def terms(self) -> dict[int, Coeff]:
+        """Return the non-zero coefficients as a sparse {exponent: coefficient} mapping."""
+        degree = self.degree
+        return {degree - i: c for i, c in enumerate(self.coeffs) if c}
+
+    @property
+    def degree(self) -> int:
+        return len(self.coeffs) - 1
+
+    @property
+    def density(self) -> float:
+        """Fraction of the dense coefficients that are non-zero."""
+        return sum(1 for c in self.coeffs if c) / len(self.coeffs)
+
+    @property
+    def is_zero(self) -> bool:
+        return len(self.coeffs) == 1 and not self.coeffs[0]
+
+    def derivative(self) -> "CoeffPoly":
+        """Differentiate the polynomial term by term."""
+        degree = self.degree
+        return CoeffPoly([c * (degree - i) for i, c in enumerate(self.coeffs[:-1])])
+
+    def antiderivative(self) -> "CoeffPoly":
+        """Integrate the polynomial term by term (c_k -> c_k / (k + 1)), with zero constant."""
+        degree = self.degree
+        return CoeffPoly(
+            [div(c, degree - i + 1) for i, c in enumerate(self.coeffs)] + [0]
+        )
+
+    def scale(self, factor: Coeff) -> "CoeffPoly":
+        """Multiply every coefficient by a constant factor."""
+        return CoeffPoly([c * factor for c in self.coeffs])
+
+    def __add__(self, other: "CoeffPoly") -> "CoeffPoly":
+        a, b = self.coeffs, other.coeffs
+        if len(a) < len(b):
+            a, b = b, a
+
+        # Align the shorter polynomial with the constant terms of the longer one
+        res = list(a)
+        offset = len(a) - len(b)
+        for i, c in enumerate(b):
+            res[offset + i] += c
+
+        return CoeffPoly(res)
+
+    def __neg__(self) -> "CoeffPoly":
+        return CoeffPoly([-c for c in self.coeffs])
+
+    def __sub__(self, other: "CoeffPoly") -> "CoeffPoly":
+        return self + (-other)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CoeffPoly) and self.coeffs == other.coeffs
+
+    def __repr__(self) -> str:
+        return f"CoeffPoly({self.coeffs})"
@@ -0,0 +1,119 @@
+from sympy import (
+    Add,
+    Expr,
+    Symbol,
+    atan,
+    factor_list,
+    integrate as sympy_integrate,
+    log,
+    sqrt,
+)
+
+from neuralsutra.kernels.divide import paravartya
+from neuralsutra.kernels.multiply import product, product_tree
+from neuralsutra.kernels.poly import CoeffPoly, div, to_coeff, to_sympy
+
+
+def _invert_mod(g: CoeffPoly, f: CoeffPoly) -> CoeffPoly:
+    """
+    Return s such that s * g = 1 (mod f), using the extended Euclidean algorithm.
+    Raises a ValueError if g and f are not coprime.
+    """
+    r0, r1 = f, paravartya(g, f)[1]
+    s0, s1 = CoeffPoly([0]), CoeffPoly([1])
+
+    while not r1.is_zero:
+        q, r = paravartya(r0, r1)
+        r0, r1 = r1, r
+        s0, s1 = s1, s0 - product(q, s1)
+
+    if r0.degree != 0:
+        raise ValueError("The polynomials are not coprime.")
+
+    return s0.scale(div(1, r0.coeffs[0]))
+
+
+def _integrate_linear(r: CoeffPoly, d: CoeffPoly, var: Symbol) -> Expr:
+    """Integrate r / d for a constant r and a linear d, giving a log term."""
+    return to_sympy(div(r.coeffs[0], d.coeffs[0])) * log(d.to_expr(var))
+
+
+def _integrate_quadratic(r: CoeffPoly, d: CoeffPoly, var: Symbol) -> Expr:
+    """
+    Integrate r / d for a (at most) linear r and a quadratic d, splitting the numerator
+    into a multiple of d' (a log term) and a constant over d (an atan, log or pole term).
+    """
+    a, b, c = d.coeffs
+    p, q = ([0] + r.coeffs)[-2:]
+
+    # r = A * (2ax + b) + B
+    A = div(p, 2 * a)
+    B = q - A * b
+    terms = [to_sympy(A) * log(d.to_expr(var))] if A else []
+
+    if B:
+        disc = b * b - 4 * a * c
+        linear = to_sympy(2 * a) * var + to_sympy(b)
+
+        if disc < 0:
+            root = sqrt(to_sympy(-disc))
+            terms.append(2 * to_sympy(B) / root * atan(linear / root))
+        elif disc == 0:
+            terms.append(-2 * to_sympy(B) / linear)
+        else:
+            root = sqrt(to_sympy(disc))
+            terms.append(to_sympy(B) / root * (log(linear - root) - log(linear + root)))
+
+    return Add(*terms)
+
+
+def _integrate_proper(r: CoeffPoly, d: CoeffPoly, var: Symbol) -> Expr:
+    """
+    Integrate the proper fraction r / d into log/atan terms, decomposing d into partial
+    fractions when it factors into distinct linear and quadratic factors over QQ.
+    """
+    if d.degree == 1:
+        return _integrate_linear(r, d, var)
+    if d.degree == 2:
+        return _integrate_quadratic(r, d, var)
+
+    const, factors = factor_list(d.to_expr(var), var)
+    if any(m != 1 or f.as_poly(var).degree() > 2 for f, m in factors):
+        # Repeated or irreducible higher-degree factors are left to SymPy
+        return sympy_integrate(r.to_expr(var) / d.to_expr(var), var)
+
+    polys = [CoeffPoly.from_expr(f, var) for f, _ in factors]
+    terms = []
+
+    for i, f in enumerate(polys):
+        # Numerator of the partial fraction over f: r * (d / f)^-1 mod f
+        cofactor = product_tree(polys[:i] + polys[i + 1 :]).scale(to_coeff(const))
+        numerator = paravartya(product(r, _invert_mod(cofactor, f)), f)[1]
+
+        if not numerator.is_zero:
+            terms.append(_integrate_proper(numerator, f, var))
+
+    return Add(*terms)
+
+
+def integrate_rational(expr: Expr, var: Symbol) -> Expr:
+    """
+    Integrate a rational function by Paravartya Yojayet division: the quotient is integrated
+    term by term on its coefficients, and the remainder over the denominator is integrated
+    into log/atan terms directly.
+    """
+    try:
+        # Split the SymPy expression into numerator and denominator
+        num, den = expr.as_numer_denom()
+        d = CoeffPoly.from_expr(den, var)
+
+        q, r = paravartya(CoeffPoly.from_expr(num, var), d)
+
+        terms = [q.antiderivative().to_expr(var)]
+        if not r.is_zero:
+            terms.append(_integrate_proper(r, d, var))
+
+        return Add(*terms)
+    except Exception:
+        # Revert to SymPy integration as a safety fallback
+        return sympy_integrate(expr, var)
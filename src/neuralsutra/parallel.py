@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+import signal
+import threading
+from typing import Any, Iterator, NamedTuple, Optional
+
+from sympy import Expr, Symbol
+
+# Compiler owned by the current worker process, loaded once by init_worker
+_compiler: Optional[Any] = None
+
+
+class CompileResult(NamedTuple):
+    """Outcome of compiling one expression of a bulk job. Failures are kept in error."""
+
+    index: int
+    expr: Expr
+    result: Optional[Expr]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CompileTimeout(BaseException):
+    """
+    Raised by time_limit. Not an Exception, so that the kernels' SymPy fallbacks (which
+    catch Exception) do not swallow it; run_item reports it as a TimeoutError.
+    """
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise CompileTimeout("Compilation timed out.")
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise a CompileTimeout in the current thread once seconds have elapsed. Only enforced
+    in the main thread of platforms with SIGALRM.
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def init_worker(model_path: str, vocab_path: str, options: dict[str, Any]) -> None:
+    """Load the router model once per worker process."""
+    global _compiler
+
+    # Imported here, as the compiler module imports this one
+    from neuralsutra.compiler import Compiler
+
+    _compiler = Compiler(model_path, vocab_path, **options)
+
+    # Load torch and the router now, rather than inside the time limit of the first item
+    _compiler.model
+
+
+def solve_task(task: Expr, var: Symbol, max_passes: int, batched: bool) -> Expr:
+    """Run the compiler passes on a task (e.g. a single Integral term) in a worker."""
+    return _compiler.solve(task, var, max_passes=max_passes, batched=batched)
+
+
+def run_item(
+    compiler: Any,
+    index: int,
+    expr: Expr,
+    var: Symbol,
+    max_passes: int,
+    batched: bool,
+    timeout: Optional[float],
+) -> CompileResult:
+    """Compile one expression of a bulk job, returning any failure as a value."""
+    try:
+        with time_limit(timeout):
+            result = compiler.compile(expr, var, max_passes=max_passes, batched=batched)
+        return CompileResult(index, expr, result, None)
+    except CompileTimeout as e:
+        return CompileResult(index, expr, None, TimeoutError(*e.args))
+    except Exception as e:
+        return CompileResult(index, expr, None, e)
+
+
+def compile_item(
+    index: int,
+    expr: Expr,
+    var: Symbol,
+    max_passes: int,
+    batched: bool,
+    timeout: Optional[float],
+) -> CompileResult:
+    """Compile one expression of a bulk job in a worker."""
+    return run_item(_compiler, index, expr, var, max_passes, batched, timeout)
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from sympy import Expr, Mul, degree
+
+from neuralsutra.kernels.integrate import ANTIDERIVATIVE_CYCLES
+
+
+def classify(node: Expr) -> Optional[int]:
+    """
+    Return the intent of a structurally unambiguous integrand without running the neural
+    router, or None if the integrand needs the router:
+    1: a pure polynomial, or a product of polynomial factors
+    2: a polynomial divided by a polynomial (a single Pow(-1) with a polynomial base)
+    3: a polynomial times a single sin, cos, exp, sinh or cosh of a linear argument
+    """
+    # Only univariate integrands are classified
+    symbols = node.free_symbols
+    if len(symbols) != 1:
+        return None
+    (var,) = symbols
+
+    # Pure polynomials are multiplied and integrated on their coefficients
+    if node.is_polynomial(var):
+        return 1
+
+    others = [f for f in Mul.make_args(node) if not f.is_polynomial(var)]
+    if len(others) != 1:
+        return None
+
+    (other,) = others
+    if other.is_Pow:
+        if other.exp == -1 and other.base.is_polynomial(var):
+            return 2
+        return None
+
+    if other.func in ANTIDERIVATIVE_CYCLES and other != node:
+        arg = other.args[0]
+        if arg.is_polynomial(var) and degree(arg, var) == 1:
+            return 3
+
+    return None
@@ -1,6 +1,9 @@
+from typing import Optional, Union
+
 import torch
 from torch import Tensor
 import torch.nn as nn
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
 
 
 class Router(nn.Module):
@@ -15,10 +18,21 @@ class Router(nn.Module):
         embedding_dim: int = 128,
         hidden_dim: int = 256,
         num_classes: int = 4,
+        device: Optional[Union[str, torch.device]] = None,
     ) -> None:
         super(Router, self).__init__()
 
-        self.embedding = nn.Embedding(vocab_size, embedding_dim, padding_idx=0)
+        # Initialise the embedding as nn.Embedding does, except on the meta device: its
+        # normal_ has no native meta kernel, and loading one takes over a second
+        weight = torch.empty(vocab_size, embedding_dim, device=device)
+        if weight.device.type != "meta":
+            with torch.no_grad():
+                nn.init.normal_(weight)
+                weight[0].fill_(0)
+
+        self.embedding = nn.Embedding(
+            vocab_size, embedding_dim, padding_idx=0, _weight=weight
+        )
 
         self.lstm = nn.LSTM(
             embedding_dim,
@@ -27,22 +41,36 @@ class Router(nn.Module):
             batch_first=True,
             bidirectional=True,
             dropout=0.2,
+            device=device,
         )
 
         # LayerNorm helps with the variance introduced by Float tokens
-        self.ln = nn.LayerNorm(hidden_dim * 2)
+        self.ln = nn.LayerNorm(hidden_dim * 2, device=device)
 
         self.fc = nn.Sequential(
-            nn.Linear(hidden_dim * 2, hidden_dim),
+            nn.Linear(hidden_dim * 2, hidden_dim, device=device),
             nn.ReLU(),
             nn.Dropout(0.3),
-            nn.Linear(hidden_dim, num_classes),
+            nn.Linear(hidden_dim, num_classes, device=device),
         )
 
-    def forward(self, x: Tensor) -> Tensor:
+    def forward(self, x: Tensor, lengths: Optional[Tensor] = None) -> Tensor:
         embedded = self.embedding(x)
 
-        out, _ = self.lstm(embedded)
+        if lengths is None:
+            out, _ = self.lstm(embedded)
+        else:
+            # Skip the padding of each sequence, so that its logits are the same as when
+            # it is run alone, and exclude the padded steps from the max-pool
+            packed = pack_padded_sequence(
+                embedded, lengths, batch_first=True, enforce_sorted=False
+            )
+            out, _ = self.lstm(packed)
+            out, _ = pad_packed_sequence(out, batch_first=True, total_length=x.size(1))
+
+            steps = torch.arange(x.size(1), device=x.device)
+            padded = steps[None, :] >= lengths[:, None].to(x.device)
+            out = out.masked_fill(padded[:, :, None], float("-inf"))
 
         pooled = torch.max(out, dim=1)[0]
 
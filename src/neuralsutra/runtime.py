@@ -0,0 +1,34 @@
+from typing import Callable
+
+import torch
+from torch import Tensor
+
+
+class OnnxRouter:
+    """Run an ONNX-exported router model with onnxruntime, returning torch logits."""
+
+    def __init__(self, path: str) -> None:
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, ids: Tensor, lengths: Tensor) -> Tensor:
+        inputs = dict(zip(self.input_names, (ids.numpy(), lengths.numpy())))
+        (logits,) = self.session.run(None, inputs)
+        return torch.from_numpy(logits)
+
+
+def load_router(path: str) -> Callable[[Tensor, Tensor], Tensor]:
+    """
+    Load an exported router model for inference: an ONNX (.onnx) file is run with
+    onnxruntime, and anything else is loaded as a TorchScript module.
+    """
+    if path.endswith(".onnx"):
+        return OnnxRouter(path)
+
+    module = torch.jit.load(path, map_location="cpu")
+    module.eval()
+    return module
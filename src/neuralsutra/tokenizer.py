@@ -0,0 +1,202 @@
+from typing import Optional
+
+import numpy as np
+from sympy import (
+    Abs,
+    Add,
+    Expr,
+    Mul,
+    Pow,
+    Symbol,
+    acos,
+    asin,
+    atan,
+    cos,
+    cosh,
+    cot,
+    csc,
+    exp,
+    log,
+    preorder_traversal,
+    sec,
+    sin,
+    sinh,
+    srepr,
+    tan,
+    tanh,
+)
+
+from neuralsutra.cache import LRUCache
+
+# Functions that srepr prints as their class name applied to their arguments
+FUNCTIONS = {sin, cos, tan, cot, sec, csc, asin, acos, atan, sinh, cosh, tanh}
+FUNCTIONS |= {exp, log, Abs}
+
+
+def split_srepr(s: str) -> list[str]:
+    """Split an srepr string into tokens, with every parenthesis as a separate token."""
+    return s.replace("(", " ( ").replace(")", " ) ").split()
+
+
+def bucket(n: int) -> int:
+    """Round a count up to the next power of two."""
+    return 1 << max(n - 1, 0).bit_length()
+
+
+def summarize(node: Expr, max_terms: int = 8, max_digits: int = 4) -> Expr:
+    """
+    Return a structure-preserving summary of a large expression for routing.
+
+    Sums with more than max_terms terms keep their first max_terms - 1 terms and their
+    last term (in srepr order), and the terms in between are collapsed into a
+    placeholder symbol such as <terms:64>, carrying the bucketed number of collapsed
+    terms. Integers and rationals with more than max_digits digits are replaced by a
+    placeholder symbol such as <digits:16>, carrying the bucketed number of digits.
+    """
+    if node.is_Rational:
+        digits = max(len(str(abs(node.p))), len(str(node.q)))
+        if digits <= max_digits:
+            return node
+
+        placeholder = Symbol(f"<digits:{bucket(digits)}>")
+        return -placeholder if node.is_negative else placeholder
+
+    if not node.args:
+        return node
+
+    args = list(node.args)
+    collapsed = None
+
+    if type(node) is Add and len(args) > max_terms:
+        terms = node.as_ordered_terms()
+        args = terms[: max_terms - 1] + terms[-1:]
+        collapsed = Symbol(f"<terms:{bucket(len(terms) - max_terms)}>")
+
+    summary = [summarize(a, max_terms, max_digits) for a in args]
+    if collapsed is None and summary == list(node.args):
+        return node
+
+    if collapsed is not None:
+        summary.append(collapsed)
+
+    # Keep the summarized structure as it is rather than re-simplifying it
+    if node.is_Add or node.is_Mul or node.is_Pow:
+        return node.func(*summary, evaluate=False)
+    return node.func(*summary)
+
+
+def _exceeds(node: Expr, limit: int) -> bool:
+    """Return True if node has more than limit subexpressions."""
+    # Stop the traversal as soon as the limit is passed
+    for count, _ in enumerate(preorder_traversal(node), 1):
+        if count > limit:
+            return True
+
+    return False
+
+
+class Tokenizer:
+    """
+    Convert SymPy expressions into vocabulary token IDs by walking the expression tree.
+
+    The IDs are identical to looking up the tokens of split_srepr(srepr(node)), so they
+    match vocabularies and routers built from srepr strings, but no intermediate string
+    is built. The IDs of each subtree are cached and copied into the preallocated array
+    of its parent, so repeated subtrees are only tokenized once.
+    """
+
+    def __init__(self, vocab: dict[str, int], cache_size: int = 4096) -> None:
+        self.vocab = vocab
+        self.cache = LRUCache(cache_size)
+
+        self._open = vocab.get("(", 0)
+        self._close = vocab.get(")", 0)
+        self._comma = vocab.get(",", 0)
+
+    def encode(self, node: Expr, max_length: Optional[int] = None) -> np.ndarray:
+        """
+        Return the token IDs of a SymPy node as a read-only 1-D int64 array.
+
+        If the sequence is longer than max_length, the node is summarized (see
+        summarize) and the summary is truncated to max_length tokens, so that the cost
+        of routing is bounded however large the expression is. Every subexpression
+        yields at least one token, so a node with more than max_length subexpressions
+        is summarized without being tokenized first; summarize still orders the terms
+        of long sums, but only descends into the terms it keeps.
+        """
+        if max_length is not None and _exceeds(node, max_length):
+            return self._encode(summarize(node))[0][:max_length]
+
+        ids = self._encode(node)[0]
+        if max_length is None or len(ids) <= max_length:
+            return ids
+
+        return self._encode(summarize(node))[0][:max_length]
+
+    def encode_string(self, s: str) -> np.ndarray:
+        """Return the token IDs of an srepr string as a 1-D int64 array."""
+        tokens = split_srepr(s)
+        return np.fromiter(
+            (self.vocab.get(t, 0) for t in tokens), dtype=np.int64, count=len(tokens)
+        )
+
+    def _encode(self, node: Expr) -> tuple[np.ndarray, str]:
+        """Return the cached token IDs of a node, along with its last token."""
+        entry = self.cache.get(node)
+        if entry is None:
+            entry = self._walk(node)
+            entry[0].flags.writeable = False
+            self.cache.put(node, entry)
+
+        return entry
+
+    def _walk(self, node: Expr) -> tuple[np.ndarray, str]:
+        """Tokenize a node, mirroring the argument order used by srepr."""
+        cls = type(node)
+
+        if cls is Add:
+            children = node.as_ordered_terms()
+        elif cls is Mul:
+            children = node.as_ordered_factors()
+        elif cls is Pow or cls in FUNCTIONS:
+            children = node.args
+        elif node.is_Integer:
+            return self._leaf(["Integer", "(", str(node.p), ")"])
+        elif node.is_Rational:
+            return self._leaf(["Rational", "(", f"{node.p},", str(node.q), ")"])
+        else:
+            # Any other node is tokenized from its srepr string
+            return self._leaf(split_srepr(srepr(node)))
+
+        entries = [self._encode(child) for child in children]
+
+        # Arguments are separated by ", ", which is a separate token after a closing
+        # parenthesis and is otherwise merged into the last token of the argument
+        size = 3 + sum(len(ids) for ids, _ in entries)
+        size += sum(1 for _, last in entries[:-1] if last == ")")
+
+        out = np.empty(size, dtype=np.int64)
+        out[0] = self.vocab.get(cls.__name__, 0)
+        out[1] = self._open
+        pos = 2
+
+        for i, (ids, last) in enumerate(entries):
+            out[pos : pos + len(ids)] = ids
+            pos += len(ids)
+
+            if i < len(entries) - 1:
+                if last == ")":
+                    out[pos] = self._comma
+                    pos += 1
+                else:
+                    out[pos - 1] = self.vocab.get(last + ",", 0)
+
+        out[pos] = self._close
+        return out, ")"
+
+    def _leaf(self, tokens: list[str]) -> tuple[np.ndarray, str]:
+        """Look up the IDs of a flat list of tokens."""
+        ids = np.fromiter(
+            (self.vocab.get(t, 0) for t in tokens), dtype=np.int64, count=len(tokens)
+        )
+        return ids, tokens[-1]
@@ -1,50 +1,99 @@
+import copy
+import math
 import os
-from sklearn.model_selection import train_test_split
+from typing import Optional, Sequence, Union
+
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-
+from torch.utils.data import DataLoader, Subset
+
+from neuralsutra.data.corpus import (
+    BucketBatchSampler,
+    TokenCorpus,
+    collate,
+    encode_corpus,
+)
 from neuralsutra.router import Router
+from neuralsutra.tokenizer import Tokenizer
 
 
 def train_router(
-    dataset: list[tuple[str, int]],
+    dataset: Union[list[tuple[str, int]], TokenCorpus],
     vocab: dict[str, int],
     model_path: str,
     test_size: float = 0.2,
     epochs: int = 3,
     lr: float = 0.001,
     weight_decay: float = 1e-5,
+    export: Sequence[str] = (),
+    max_length: Optional[int] = None,
+    batch_size: int = 32,
+    num_workers: int = 0,
+    num_threads: Optional[int] = None,
+    seed: Optional[int] = None,
 ) -> None:
-    """Train and validate the Router model."""
+    """
+    Train and validate the Router model. The trained model can also be exported for
+    inference in the formats listed in export (see save_model).
+
+    The dataset is either a list of (srepr string, label) pairs, which is tokenized once
+    up front, or a TokenCorpus, e.g. a memory-mapped corpus written by write_corpus.
+    Token sequences are truncated to max_length, which should match the max_length the
+    dataset was generated with and the Compiler routes with.
+
+    Batches group expressions of similar length to minimise padding, and are prefetched
+    by num_workers DataLoader worker processes. num_threads sets the number of threads
+    PyTorch uses on the CPU, and seed makes the order of the batches reproducible.
+    """
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Training on: {device}")
 
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
     model = Router(len(vocab) + 1).to(device)
     optimizer = optim.AdamW(model.parameters(), lr=lr, weight_decay=weight_decay)
     criterion = nn.CrossEntropyLoss()
 
-    train_data, val_data = train_test_split(dataset, test_size=test_size)
-    batch_size = 32
+    if not isinstance(dataset, TokenCorpus):
+        dataset = encode_corpus(dataset, vocab, max_length)
+
+    # Hold out a random test_size fraction of the samples for validation
+    order = np.random.permutation(len(dataset))
+    n_val = math.ceil(test_size * len(dataset))
+    val_idx, train_idx = order[:n_val], order[n_val:]
+    lengths = dataset.lengths
+
+    # Each batch is padded to its longest expression by collate
+    train_loader = DataLoader(
+        Subset(dataset, train_idx),
+        batch_sampler=BucketBatchSampler(lengths[train_idx], batch_size, seed=seed),
+        collate_fn=collate,
+        num_workers=num_workers,
+        persistent_workers=num_workers > 0,
+        pin_memory=device.type == "cuda",
+    )
+
+    # The validation batches are the same every epoch, so they are only built once,
+    # from the whole validation split sorted by length
+    val_batches = list(
+        DataLoader(
+            Subset(dataset, val_idx),
+            batch_sampler=BucketBatchSampler(
+                lengths[val_idx], batch_size, pool_size=len(val_idx), shuffle=False
+            ),
+            collate_fn=collate,
+        )
+    )
 
     for epoch in range(epochs):
         model.train()
         train_loss = 0
 
-        for i in range(0, len(train_data), batch_size):
-            batch = train_data[i : i + batch_size]
-
-            # Tokenize and convert to tensors
-            batch_ids = []
-            for s_expr, _ in batch:
-                tokens = s_expr.replace("(", " ( ").replace(")", " ) ").split()
-                batch_ids.append(torch.tensor([vocab.get(t, 0) for t in tokens]))
-
-            # Pad to make all expressions in this batch the same length
-            ids = torch.nn.utils.rnn.pad_sequence(batch_ids, batch_first=True).to(
-                device
-            )
-            labels = torch.tensor([label for _, label in batch]).to(device)
+        for ids, labels in train_loader:
+            ids, labels = ids.to(device), labels.to(device)
 
             optimizer.zero_grad()
             output = model(ids)
@@ -59,18 +108,8 @@ def train_router(
         val_loss = 0
         correct = 0
         with torch.no_grad():
-            for i in range(0, len(val_data), batch_size):
-                v_batch = val_data[i : i + batch_size]
-
-                v_ids_list = []
-                for s_expr, _ in v_batch:
-                    tokens = s_expr.replace("(", " ( ").replace(")", " ) ").split()
-                    v_ids_list.append(torch.tensor([vocab.get(t, 0) for t in tokens]))
-
-                v_ids = torch.nn.utils.rnn.pad_sequence(
-                    v_ids_list, batch_first=True
-                ).to(device)
-                v_labels = torch.tensor([l for _, l in v_batch]).to(device)
+            for v_ids, v_labels in val_batches:
+                v_ids, v_labels = v_ids.to(device), v_labels.to(device)
 
                 v_output = model(v_ids)
                 v_loss = criterion(v_output, v_labels)
@@ -78,21 +117,30 @@ def train_router(
                 val_loss += v_loss.item() * v_ids.size(0)
                 correct += (v_output.argmax(dim=1) == v_labels).sum().item()
 
-        avg_train = train_loss / len(train_data)
-        avg_val = val_loss / len(val_data)
-        accuracy = (correct / len(val_data)) * 100
+        avg_train = train_loss / len(train_idx)
+        avg_val = val_loss / len(val_idx)
+        accuracy = (correct / len(val_idx)) * 100
 
         print(
             f"Epoch {epoch+1} | Train Loss: {avg_train:.4f} | Val Loss: {avg_val:.4f} | Val Acc: {accuracy:.2f}%"
         )
 
     # Save the model
-    save_model(model, model_path)
+    save_model(model, model_path, export=export)
     print(f"Model saved to {model_path}")
 
 
-def save_model(model: nn.Module, path: str) -> None:
-    """Save the trained model as a serialized PyTorch state dictionary (.pth) file."""
+# File extension of each export format, replacing the extension of the model path
+EXPORT_SUFFIXES = {"torchscript": ".pt", "onnx": ".onnx"}
+
+
+def save_model(model: nn.Module, path: str, export: Sequence[str] = ()) -> None:
+    """
+    Save the trained model as a serialized PyTorch state dictionary (.pth) file.
+
+    Each format in export ("torchscript" and/or "onnx") is also written next to it,
+    e.g. models/router.pt and models/router.onnx for models/router.pth.
+    """
     directory = os.path.dirname(path)
 
     # Create the directory if it doesn't exist
@@ -101,3 +149,90 @@ def save_model(model: nn.Module, path: str) -> None:
         print(f"Created directory: {directory}")
 
     torch.save(model.state_dict(), path)
+
+    for fmt in export:
+        export_path = os.path.splitext(path)[0] + EXPORT_SUFFIXES[fmt]
+        export_model(model, export_path)
+        print(f"Exported {fmt} model to {export_path}")
+
+
+def export_model(model: nn.Module, path: str, method: str = "script") -> None:
+    """
+    Export the model for inference only: as ONNX for an .onnx path, otherwise as a
+    frozen TorchScript module, built with torch.jit.script or torch.jit.trace (method).
+    """
+    model = copy.deepcopy(model).cpu().eval()
+
+    # Example padded batch of token IDs and sequence lengths; the batch and sequence
+    # dimensions remain dynamic
+    example = (torch.ones(2, 8, dtype=torch.long), torch.tensor([8, 5]))
+
+    if path.endswith(".onnx"):
+        torch.onnx.export(
+            model,
+            example,
+            path,
+            input_names=["ids", "lengths"],
+            output_names=["logits"],
+            dynamic_axes={
+                "ids": {0: "batch", 1: "sequence"},
+                "lengths": {0: "batch"},
+                "logits": {0: "batch"},
+            },
+            dynamo=False,
+        )
+        return
+
+    if method == "trace":
+        module = torch.jit.trace(model, example)
+    else:
+        module = torch.jit.script(model)
+
+    # Freezing inlines the weights and drops training-only modules such as dropout
+    torch.jit.save(torch.jit.freeze(module), path)
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    """
+    Return a copy of the model with its LSTM and Linear layers dynamically quantized to
+    int8, for CPU inference.
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.LSTM, nn.Linear}, dtype=torch.qint8
+    )
+
+
+def evaluate_router(
+    model: nn.Module,
+    dataset: list[tuple[str, int]],
+    vocab: dict[str, int],
+    batch_size: int = 32,
+    max_length: Optional[int] = None,
+) -> float:
+    """
+    Return the accuracy (%) of the model on a labelled dataset, on the CPU, with token
+    sequences truncated to max_length.
+    """
+    model.eval()
+    tokenizer = Tokenizer(vocab)
+    correct = 0
+
+    with torch.no_grad():
+        for i in range(0, len(dataset), batch_size):
+            batch = dataset[i : i + batch_size]
+
+            batch_ids = [
+                torch.from_numpy(tokenizer.encode_string(s_expr)[:max_length])
+                for s_expr, _ in batch
+            ]
+
+            ids = torch.nn.utils.rnn.pad_sequence(batch_ids, batch_first=True)
+            lengths = torch.tensor([len(seq) for seq in batch_ids])
+            labels = torch.tensor([label for _, label in batch])
+
+            # Route each sequence as the Compiler does, ignoring its padding
+            logits = model(ids, lengths)
+            correct += (logits.argmax(dim=1) == labels).sum().item()
+
+    return (correct / len(dataset)) * 100
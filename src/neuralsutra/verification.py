@@ -1,8 +1,26 @@
-from sympy import diff, sympify, Expr, Abs, Symbol
+import mpmath
+import numpy as np
+from sympy import diff, lambdify, sympify, Expr, Abs, Symbol
+
+# Smallest relative difference the float pre-screen can resolve; differences below it
+# are rounding noise, so the pre-screen uses the larger of this and the tolerance
+PRESCREEN_FLOOR = 1e3 * np.finfo(float).eps
+
+
+def chebyshev_points(n: int, low: float = 0.5, high: float = 4.5) -> np.ndarray:
+    """Return the n Chebyshev nodes (of the first kind) of the interval [low, high]."""
+    k = np.arange(n)
+    nodes = np.cos((2 * k + 1) * np.pi / (2 * n))
+    return (low + high) / 2 + (high - low) / 2 * nodes
 
 
 def verify_integration(
-    original_expr: Expr, integrated_result: Expr, var: Symbol
+    original_expr: Expr,
+    integrated_result: Expr,
+    var: Symbol,
+    vectorized: bool = False,
+    samples: int = 64,
+    tolerance: float = 1e-12,
 ) -> bool:
     """
     Verify the mathematical correctness of an integration result.
@@ -16,6 +34,11 @@ def verify_integration(
     of the result at specific 'safe' integer sample points [2, 3, 4] using
     high-precision (50-digit) arithmetic. This bypasses floating-point noise and
     confirms identity for complex trigonometric or transcendental forms.
+
+    If vectorized is True, both expressions are instead compiled once with lambdify and
+    compared over samples Chebyshev points (see verify_numerically), which is faster
+    and checks far more points. Differences are relative to the larger of the two
+    values, and must not exceed tolerance.
     """
     if integrated_result is None:
         return False
@@ -31,6 +54,15 @@ def verify_integration(
         if proposed_deriv == integrand:
             return True
 
+        if vectorized:
+            try:
+                return verify_numerically(
+                    integrand, proposed_deriv, var, samples, tolerance
+                )
+            except Exception:
+                # Expressions that cannot be lambdified are checked point by point
+                pass
+
         # Use 'safe' integers instead of random floats to avoid floating point 'noise'
         # in trigonometric functions.
         test_points = [2, 3, 4]
@@ -49,11 +81,68 @@ def verify_integration(
             # If the difference is extremely small relative to the value
             # or if the absolute difference is near zero
             if max_val > 0:
-                if (diff_val / max_val) > 1e-12:
+                if (diff_val / max_val) > tolerance:
                     return False
-            elif diff_val > 1e-12:
+            elif diff_val > tolerance:
                 return False
 
         return True
     except Exception as e:
         return False
+
+
+def verify_numerically(
+    expr: Expr,
+    other: Expr,
+    var: Symbol,
+    samples: int = 64,
+    tolerance: float = 1e-12,
+    confirm: int = 3,
+    precision: int = 50,
+) -> bool:
+    """
+    Check numerically that two expressions in var are equal, over samples Chebyshev
+    points of [0.5, 4.5].
+
+    Both expressions are lambdified once and evaluated over every point in a single
+    NumPy call. Points where they differ by more than tolerance in floating point (or
+    by more than PRESCREEN_FLOOR, below which floats cannot resolve a difference) or
+    where either is not finite, along with confirm points spread over the interval,
+    are then re-evaluated with mpmath at precision digits, where they must agree within
+    tolerance. Points at which either expression is not finite in mpmath are skipped.
+    """
+    points = chebyshev_points(samples)
+
+    # Fast float pre-screen of every point at once
+    with np.errstate(all="ignore"):
+        v1 = np.broadcast_to(lambdify(var, expr, "numpy")(points), points.shape)
+        v2 = np.broadcast_to(lambdify(var, other, "numpy")(points), points.shape)
+        v1, v2 = v1.astype(complex), v2.astype(complex)
+
+        finite = np.isfinite(v1) & np.isfinite(v2)
+        scale = np.maximum(np.maximum(abs(v1), abs(v2)), 1)
+        cutoff = max(tolerance, PRESCREEN_FLOOR)
+        suspect = ~finite | (abs(v1 - v2) > cutoff * scale)
+
+    # Re-check the suspect points first, as they are the likeliest to fail
+    spread = np.linspace(0, samples - 1, min(confirm, samples)).astype(int)
+    indices = dict.fromkeys([*np.flatnonzero(suspect), *spread])
+
+    f1 = lambdify(var, expr, "mpmath")
+    f2 = lambdify(var, other, "mpmath")
+
+    with mpmath.workdps(precision):
+        for i in indices:
+            x = mpmath.mpf(float(points[i]))
+            a, b = f1(x), f2(x)
+
+            if not (mpmath.isfinite(a) and mpmath.isfinite(b)):
+                continue
+
+            diff_val = abs(a - b)
+            max_val = max(abs(a), abs(b))
+
+            if diff_val > tolerance * (max_val if max_val > 0 else 1):
+                return False
+
+    return True
@@ -1,13 +1,13 @@
 import json
 import os
+from typing import Iterable
 
+from neuralsutra.tokenizer import split_srepr
 
-def build_vocab(dataset: list[tuple[str, int]]) -> dict[str, int]:
+
+def build_vocab(dataset: Iterable[tuple[str, int]]) -> dict[str, int]:
     """Create a unique ID for every symbolic SymPy expression token found in the dataset."""
-    all_tokens = " ".join(
-        [d[0].replace("(", " ( ").replace(")", " ) ") for d in dataset]
-    ).split()
-    unique_tokens = sorted(list(set(all_tokens)))
+    unique_tokens = sorted({t for s_expr, _ in dataset for t in split_srepr(s_expr)})
     vocab = {tok: i + 1 for i, tok in enumerate(unique_tokens)}
     vocab["<UNK>"] = 0
 
@@ -1,10 +1,16 @@
 import pytest
 
 from pathlib import Path
+import random
 from sympy import Symbol
 import sys
+import torch
 
 from neuralsutra.compiler import Compiler
+from neuralsutra.data.generate import generate_dataset
+from neuralsutra.router import Router
+from neuralsutra.trainer import save_model
+from neuralsutra.vocab import build_vocab, save_vocab
 
 # Add src/ to sys.path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -20,3 +26,32 @@ def x():
 def compiler():
     """Define a shared Compiler instance for tests."""
     return Compiler("models/router.pth", "models/vocab.json")
+
+
+@pytest.fixture(scope="session")
+def model_files(tmp_path_factory):
+    """
+    Save an untrained router model and a small vocabulary, so that compiler tests
+    do not depend on a trained model being present in 'models/'.
+    """
+    random.seed(0)
+    torch.manual_seed(0)
+
+    directory = tmp_path_factory.mktemp("models")
+    vocab = build_vocab(generate_dataset(samples_per_class=20))
+
+    model_path = str(directory / "router.pth")
+    vocab_path = str(directory / "vocab.json")
+    save_model(Router(vocab_size=len(vocab) + 1), model_path)
+    save_vocab(vocab, vocab_path)
+
+    return model_path, vocab_path
+
+
+@pytest.fixture
+def tiny_compiler(model_files):
+    """
+    Define a Compiler instance backed by the untrained router model, with the pre-router
+    disabled so that every integrand reaches the router.
+    """
+    return Compiler(*model_files, prerouter=False)
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+from sympy import Integral, cos, exp, sin
+
+from neuralsutra.async_compiler import AsyncCompiler
+from neuralsutra.verification import verify_integration
+
+
+def test_async_compile_concurrent(tiny_compiler, x):
+    """Test that concurrent compilations are correct and share router batches."""
+    exprs = [x**2 * sin(x), x**3 * cos(x), (x**2 + 1) / (x + 2), x * exp(2 * x)]
+
+    async def run():
+        async with AsyncCompiler(tiny_compiler, max_wait=0.2) as compiler:
+            results = await asyncio.gather(*(compiler.compile(e, x) for e in exprs))
+            return compiler, results
+
+    compiler, results = asyncio.run(run())
+
+    for expr, result in zip(exprs, results):
+        assert not result.has(Integral)
+        assert verify_integration(expr, result, x)
+
+    assert compiler.batches < compiler.requests
+
+
+def test_async_route_max_batch_size(tiny_compiler, x):
+    """Test that a full micro-batch is routed without waiting."""
+
+    async def run():
+        async with AsyncCompiler(tiny_compiler, max_batch_size=2, max_wait=60) as c:
+            intents = await asyncio.wait_for(c.route([sin(x), x**2 * cos(x)]), 5)
+            return c, intents
+
+    compiler, intents = asyncio.run(run())
+
+    assert len(intents) == 2
+    assert compiler.batches == 1
+
+
+def test_async_route_cancelled_request(tiny_compiler, x, monkeypatch):
+    """Test that cancelling a queued request leaves the other slices aligned."""
+    # Route each integrand to its position in the batch
+    monkeypatch.setattr(tiny_compiler, "predict_batch", lambda n: list(range(len(n))))
+
+    async def run():
+        async with AsyncCompiler(tiny_compiler, max_wait=0.2) as compiler:
+            first = asyncio.ensure_future(compiler.route([sin(x), cos(x)]))
+            second = asyncio.ensure_future(compiler.route([x, x**2, x**3]))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+    assert asyncio.run(run()) == [2, 3, 4]
+
+
+def test_async_close_after_timeout(tiny_compiler, x):
+    """Test that closing does not deadlock with a timed-out compilation still routing."""
+
+    async def run():
+        # A single request never fills the batch, so it waits in the queue
+        async with AsyncCompiler(tiny_compiler, max_wait=60) as compiler:
+            try:
+                await asyncio.wait_for(compiler.compile(x**2 * sin(x), x), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+    thread = threading.Thread(target=asyncio.run, args=(run(),), daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert not thread.is_alive()
@@ -0,0 +1,49 @@
+from sympy import Rational, sin
+
+from neuralsutra.cache import LRUCache, structural_key
+
+
+def test_lru_eviction_order():
+    """Test that the least recently used entry is evicted first."""
+    cache = LRUCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Touch 'a' so that 'b' becomes the least recently used entry
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {
+        "size": 2,
+        "capacity": 2,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_disabled():
+    """Test that a zero-capacity cache never stores entries."""
+    cache = LRUCache(capacity=0)
+    cache.put("a", 1)
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+def test_structural_key_abstracts_coefficients(x):
+    """Test that coefficients are abstracted, while exponents are not."""
+    assert structural_key(3 * x**2 * sin(x)) == structural_key(5 * x**2 * sin(x))
+    assert structural_key(x**2 + Rational(1, 2)) == structural_key(x**2 - 7)
+    assert structural_key(x**2 * sin(x)) != structural_key(x**3 * sin(x))
+    assert structural_key(1 / (x + 1)) != structural_key(x + 1)
+
+
+def test_structural_key_exact(x):
+    """Test that coefficients are kept when abstraction is disabled."""
+    key_3 = structural_key(3 * x**2 * sin(x), abstract_coefficients=False)
+    key_5 = structural_key(5 * x**2 * sin(x), abstract_coefficients=False)
+
+    assert key_3 != key_5
@@ -0,0 +1,237 @@
+import time
+
+import pytest
+import torch
+from sympy import Integral, Mul, cos, exp, sin
+
+from neuralsutra.compiler import Compiler
+from neuralsutra.parallel import CompileTimeout, time_limit
+from neuralsutra.router import Router
+from neuralsutra.trainer import EXPORT_SUFFIXES, quantize_model, save_model
+from neuralsutra.verification import verify_integration
+
+
+def test_predict_batch_matches_predict(tiny_compiler, x):
+    """Test that batched routing returns one valid intent per node."""
+    nodes = [x**2 * sin(x), Mul(x + 1, x - 1, evaluate=False), (x**2 + 1) / (x + 3)]
+
+    intents = tiny_compiler.predict_batch(nodes)
+
+    assert len(intents) == len(nodes)
+    assert all(intent in range(4) for intent in intents)
+    assert tiny_compiler.predict_batch(nodes[:1]) == [tiny_compiler.predict(nodes[0])]
+    assert tiny_compiler.predict_batch([]) == []
+    assert tiny_compiler.route_counts["router"] > 0
+
+
+def test_predict_batch_mixed_lengths(model_files, x):
+    """Test that each node is routed the same inside a mixed-length batch as alone."""
+    compiler = Compiler(*model_files, cache_size=0, prerouter=False)
+    nodes = [
+        x**2 * sin(x),
+        Mul(x + 1, x - 1, evaluate=False),
+        (x**2 + 1) / (x + 3),
+        x**5 * cos(3 * x + 1) + 7,
+        x * exp(x),
+    ]
+
+    # Record the token batches that reach the router
+    batches = []
+    model = compiler.model
+    compiler._model = lambda *batch: batches.append(batch) or model(*batch)
+
+    intents = compiler.predict_batch(nodes)
+
+    # A single padded forward pass routes the nodes as if each were alone
+    ((ids, lengths),) = batches
+    with torch.no_grad():
+        logits = model(ids, lengths)
+        alone = [model(compiler.encode(n)[None]) for n in nodes]
+
+    assert (ids == 0).any()
+    assert all(torch.allclose(a[0], b, atol=1e-6) for a, b in zip(alone, logits))
+    assert intents == [compiler.predict(n) for n in nodes]
+
+
+def test_compile_batched(tiny_compiler, x):
+    """Test that batched compilation integrates every additive term."""
+    expr = 3 * x**2 * exp(x) - 5 * x**4 * cos(x) + (x**3 + 2 * x) / (x + 5)
+
+    result = tiny_compiler.compile(expr, x, batched=True)
+
+    assert not result.has(Integral)
+    assert verify_integration(expr, result, x)
+    assert tiny_compiler.route_counts["router"] > 0
+
+
+def test_routing_cache(model_files, x):
+    """Test that integrands differing only in coefficients share a cache entry."""
+    compiler = Compiler(*model_files, cache_size=1, prerouter=False)
+
+    intent = compiler.predict(3 * x**2 * sin(x))
+    assert compiler.predict(5 * x**2 * sin(x)) == intent
+    assert (compiler.cache.hits, compiler.cache.misses) == (1, 1)
+
+    # A different structure evicts the only entry
+    compiler.predict(x**2 * exp(x))
+    assert compiler.cache.evictions == 1
+
+
+def test_prerouter_counts(model_files, x):
+    """Test that unambiguous integrands skip the router and that unsure routes fall back."""
+    compiler = Compiler(*model_files, confidence_threshold=1.0)
+
+    intents = compiler.predict_batch([x**3 + 1, x * sin(2 * x), sin(x) ** 2])
+
+    assert intents == [1, 3, 0]
+    assert compiler.route_counts == {
+        "prerouter": 2,
+        "cache": 0,
+        "router": 1,
+        "low_confidence": 1,
+    }
+
+
+def test_transform_polynomial_product(tiny_compiler, x):
+    """Test that intent 1 integrates a polynomial product without SymPy's integrator."""
+    integrand = Mul(x**2 + 3 * x + 1, x**2 - 3 * x + 1, x**4 + 1, evaluate=False)
+
+    result = tiny_compiler.transform(Integral(integrand, x), x, intent=1)
+
+    assert not result.has(Integral)
+    assert verify_integration(integrand, result, x)
+
+
+def test_compile_parallel(model_files, x):
+    """Test that sharding the additive terms across workers gives the serial result."""
+    expr = sum(k * x**k * sin(x) for k in range(1, 5)) + (x**3 + 2) / (x + 1)
+
+    with Compiler(*model_files, workers=2, parallel_threshold=2) as compiler:
+        parallel = compiler.compile(expr, x)
+
+    serial = Compiler(*model_files).compile(expr, x)
+
+    assert parallel == serial
+    assert verify_integration(expr, parallel, x)
+
+
+def test_compile_many_serial(tiny_compiler, x):
+    """Test that bulk compilation returns results in order, with failures as values."""
+    exprs = [x**2 * sin(x), "x +", (x**3 + 2) / (x + 1)]
+
+    results = list(tiny_compiler.compile_many(exprs, x))
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert results[0].ok and verify_integration(exprs[0], results[0].result, x)
+    assert not results[1].ok and results[1].result is None
+    assert results[2].ok and verify_integration(exprs[2], results[2].result, x)
+
+
+def test_compile_many_timeout(tiny_compiler, x):
+    """Test that an item exceeding its timeout is reported as a TimeoutError."""
+    expr = sum(x**k * exp(x) * sin(x) for k in range(1, 8))
+
+    (result,) = tiny_compiler.compile_many([expr], x, timeout=0.01)
+
+    assert isinstance(result.error, TimeoutError)
+
+
+def test_time_limit_escapes_fallbacks():
+    """Test that a time limit is not swallowed by the kernels' exception fallbacks."""
+    with pytest.raises(CompileTimeout):
+        with time_limit(0.05):
+            try:
+                time.sleep(1)
+            except Exception:
+                pass
+
+
+def test_compile_many_pool(model_files, x):
+    """Test bulk compilation in a worker pool, both in order and as completed."""
+    exprs = [k * x**k * cos(x) for k in range(1, 7)]
+
+    with Compiler(*model_files) as compiler:
+        ordered = list(compiler.compile_many(exprs, x, workers=2))
+        completed = list(compiler.compile_many(exprs, x, workers=2, ordered=False))
+
+    assert [r.index for r in ordered] == list(range(6))
+    assert sorted(r.index for r in completed) == list(range(6))
+    assert all(r.ok and verify_integration(r.expr, r.result, x) for r in ordered)
+
+
+def test_compile_batched_routes_integrands(tiny_compiler, x, monkeypatch):
+    """Test that batched compilation routes the integrands, as predict does."""
+    routed = []
+    predict_batch = tiny_compiler.predict_batch
+
+    def record(nodes):
+        routed.extend(nodes)
+        return predict_batch(nodes)
+
+    monkeypatch.setattr(tiny_compiler, "predict_batch", record)
+    tiny_compiler.compile(x**2 * sin(x) + x * exp(x), x, batched=True)
+
+    assert routed and not any(isinstance(n, Integral) for n in routed)
+    assert tiny_compiler.route_counts["router"] > 0
+
+
+@pytest.mark.parametrize("fmt", ["torchscript", "onnx"])
+def test_exported_runtime(model_files, tmp_path, x, fmt):
+    """Test that an exported router gives the same intents as the eager model."""
+    if fmt == "onnx":
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+
+    eager = Compiler(*model_files, cache_size=0, prerouter=False)
+    model_path = str(tmp_path / "router.pth")
+    save_model(eager.model, model_path, export=[fmt])
+
+    exported = Compiler(
+        *model_files,
+        cache_size=0,
+        prerouter=False,
+        runtime_path=model_path[:-4] + EXPORT_SUFFIXES[fmt],
+    )
+    nodes = [x**2 * sin(x), Mul(x + 1, x - 1, evaluate=False), (x**2 + 1) / (x + 3)]
+
+    assert not isinstance(exported.model, Router)
+    assert exported.predict_batch(nodes) == eager.predict_batch(nodes)
+    assert exported.route_counts["router"] == len(nodes)
+
+
+def test_exported_runtime_fallback(model_files, tmp_path):
+    """Test that a missing export falls back to the eager model with a warning."""
+    compiler = Compiler(*model_files, runtime_path=str(tmp_path / "missing.pt"))
+
+    # The router is only loaded on first use
+    with pytest.warns(UserWarning):
+        assert isinstance(compiler.model, Router)
+
+
+def test_quantized_router(model_files, tmp_path, x):
+    """Test that the compiler loads dynamically quantized router weights."""
+    eager = Compiler(*model_files, prerouter=False)
+    model_path = str(tmp_path / "router_int8.pth")
+    save_model(quantize_model(eager.model), model_path)
+
+    compiler = Compiler(model_path, model_files[1], quantized=True, prerouter=False)
+    expr = x**2 * sin(x) + (x**2 + 1) / (x + 3)
+
+    assert compiler.predict(x**2 * sin(x)) in range(4)
+    assert verify_integration(expr, compiler.compile(expr, x), x)
+    assert compiler.route_counts["router"] > 0
+    assert isinstance(compiler.model.lstm, torch.ao.nn.quantized.dynamic.LSTM)
+
+
+def test_mmap_router(model_files, x):
+    """Test that memory-mapped router weights route like the eagerly loaded ones."""
+    eager = Compiler(*model_files, cache_size=0, prerouter=False)
+    mapped = Compiler(*model_files, cache_size=0, prerouter=False, mmap=True)
+    nodes = [x**2 * sin(x), Mul(x + 1, x - 1, evaluate=False), (x**2 + 1) / (x + 3)]
+
+    assert mapped.predict_batch(nodes) == eager.predict_batch(nodes)
+    assert all(p.device.type == "cpu" for p in mapped.model.parameters())
+    assert mapped.worker_options()["mmap"]
+
+    with pytest.raises(ValueError):
+        Compiler(*model_files, quantized=True, mmap=True)
@@ -0,0 +1,77 @@
+import pickle
+import random
+
+import numpy as np
+
+import torch
+
+from neuralsutra.data.corpus import (
+    BucketBatchSampler,
+    TokenCorpus,
+    encode_corpus,
+    write_corpus,
+)
+from neuralsutra.data.generate import generate_dataset
+from neuralsutra.tokenizer import Tokenizer
+from neuralsutra.trainer import train_router
+from neuralsutra.vocab import build_vocab
+
+
+def test_write_and_load_corpus(tmp_path):
+    """Test that a corpus streamed to disk in chunks memory-maps back to the same samples."""
+    random.seed(0)
+    dataset = generate_dataset(samples_per_class=10)
+    vocab = build_vocab(dataset)
+
+    count = write_corpus(iter(dataset), vocab, str(tmp_path), chunk_size=7)
+    corpus = TokenCorpus.load(str(tmp_path))
+    tokenizer = Tokenizer(vocab)
+
+    assert count == len(corpus) == len(dataset)
+    assert corpus.tokens.dtype.itemsize == 4
+    for (s_expr, label), (ids, corpus_label) in zip(dataset, corpus):
+        assert ids.tolist() == tokenizer.encode_string(s_expr).tolist()
+        assert corpus_label == label
+
+    # The in-memory corpus holds exactly the same arrays
+    in_memory = encode_corpus(dataset, vocab)
+    assert (in_memory.tokens == corpus.tokens).all()
+    assert (in_memory.offsets == corpus.offsets).all()
+
+
+def test_train_router_on_corpus(tmp_path):
+    """Test that the router trains directly on a memory-mapped corpus."""
+    random.seed(0)
+    dataset = generate_dataset(samples_per_class=10)
+    vocab = build_vocab(dataset)
+    write_corpus(dataset, vocab, str(tmp_path / "corpus"))
+
+    model_path = str(tmp_path / "router.pth")
+    train_router(
+        TokenCorpus.load(str(tmp_path / "corpus")), vocab, model_path, epochs=1
+    )
+
+    assert "fc.3.weight" in torch.load(model_path)
+
+
+def test_bucket_batch_sampler():
+    """Test that every sample is batched once, with similar lengths in each batch."""
+    lengths = np.random.default_rng(0).integers(1, 200, size=1000)
+    sampler = BucketBatchSampler(lengths, batch_size=32, pool_size=4, seed=0)
+
+    batches = list(sampler)
+    assert len(batches) == len(sampler) == 32
+    assert sorted(i for batch in batches for i in batch) == list(range(1000))
+
+    # Batches are padded to far fewer tokens than random batches of the same size
+    padded = sum(len(batch) * lengths[batch].max() for batch in batches)
+    assert padded < 0.75 * 1000 * lengths.max()
+
+
+def test_pickle_loaded_corpus(tmp_path):
+    """Test that a memory-mapped corpus is re-mapped, not copied, when pickled."""
+    write_corpus([("Integer(1)", 0), ("Symbol('x')", 3)], {}, str(tmp_path))
+    corpus = pickle.loads(pickle.dumps(TokenCorpus.load(str(tmp_path))))
+
+    assert isinstance(corpus.tokens, np.memmap)
+    assert corpus.labels.tolist() == [0, 3]
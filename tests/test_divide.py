@@ -1,5 +1,7 @@
 from sympy import simplify, sin, Rational, symbols, Poly
-from neuralsutra.kernels.divide import divide
+from neuralsutra.kernels.divide import divide, paravartya, synthetic
+from neuralsutra.kernels.multiply import urdhva
+from neuralsutra.kernels.poly import CoeffPoly
 
 
 def test_divide_basic(x):
@@ -109,3 +111,41 @@ def test_divide_fallback(x):
 
     assert result == expr
     assert result.has(sin)
+
+
+def test_divide_high_degree_monic_linear(x):
+    """Test the synthetic division path on a high-degree numerator."""
+    num = CoeffPoly([k % 7 - 3 for k in range(1001)])
+    den = CoeffPoly.from_expr(x - 15, x)
+
+    q, r = paravartya(num, den)
+
+    # Check that num == q * den + r
+    reconstructed = urdhva(q, den).coeffs
+    reconstructed[-1] += r.coeffs[0]
+
+    assert r.degree == 0
+    assert CoeffPoly(reconstructed) == num
+
+
+def test_synthetic_division(x):
+    """Test that Horner's method returns the quotient and the remainder."""
+    num = CoeffPoly.from_expr(x**9 + 12345 * x**5 - 67890, x)
+
+    q_coeffs, r = synthetic(num, 15)
+    q, expected_r = Poly(x**9 + 12345 * x**5 - 67890, x).div(Poly(x - 15, x))
+
+    assert CoeffPoly(q_coeffs) == CoeffPoly.from_expr(q.as_expr(), x)
+    assert r == int(expected_r.as_expr())
+
+
+def test_paravartya_monic_quadratic(x):
+    """Test the general path with a monic (unnormalised) divisor."""
+    num = CoeffPoly.from_expr(x**5 - 3 * x**2 + 7, x)
+    den = CoeffPoly.from_expr(x**2 + 2 * x - 1, x)
+
+    q, r = paravartya(num, den)
+    expected_q, expected_r = Poly(x**5 - 3 * x**2 + 7, x).div(Poly(x**2 + 2 * x - 1, x))
+
+    assert q == CoeffPoly.from_expr(expected_q.as_expr(), x)
+    assert r == CoeffPoly.from_expr(expected_r.as_expr(), x)
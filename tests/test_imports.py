@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+import pytest
+
+PROBE = """
+import sys
+import neuralsutra.kernels.integrate, neuralsutra.kernels.rational
+import neuralsutra.verification, neuralsutra.engine
+from neuralsutra.compiler import Compiler
+
+compiler = Compiler(*sys.argv[1:])
+print("torch" in sys.modules, "sklearn" in sys.modules)
+
+from sympy import Symbol, sin
+x = Symbol("x")
+compiler.predict(sin(x) ** 2)
+print("torch" in sys.modules)
+"""
+
+
+def test_lazy_imports(model_files):
+    """Test that kernels, verification and the compiler import without torch or sklearn."""
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, *model_files],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    # torch is only imported once an integrand needs the neural router
+    assert out == ["False", "False", "True"]
+
+
+COMPILE_MANY_PROBE = """
+import sys
+from sympy import Symbol, cos, exp, sin
+from neuralsutra.compiler import Compiler
+
+x = Symbol("x")
+exprs = [x**2 * sin(x), x * exp(x), x**3 * cos(x)]
+workers = int(sys.argv[3])
+
+with Compiler(*sys.argv[1:3], prerouter=False) as compiler:
+    print("torch" in sys.modules)
+    for r in compiler.compile_many(exprs, x, workers=workers, timeout=0.5):
+        print(type(r.error).__name__)
+"""
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_compile_many_cold_import(model_files, workers):
+    """Test that loading torch for compile_many does not count against item timeouts."""
+    out = subprocess.run(
+        [sys.executable, "-c", COMPILE_MANY_PROBE, *model_files, str(workers)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert out == ["False", "NoneType", "NoneType", "NoneType"]
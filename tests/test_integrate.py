@@ -1,6 +1,25 @@
-from sympy import sin, cos, exp, simplify, diff
-
-from neuralsutra.kernels.integrate import integrate
+from concurrent.futures import ThreadPoolExecutor
+
+from sympy import (
+    Integral,
+    Mul,
+    Rational,
+    atan,
+    cos,
+    cosh,
+    diff,
+    exp,
+    expand,
+    simplify,
+    sin,
+    sinh,
+)
+
+from neuralsutra.kernels.integrate import (
+    ANTIDERIVATIVE_CACHE,
+    integrate,
+    integrate_polynomial,
+)
 
 
 def test_integrate_poly_sin(x):
@@ -56,3 +75,79 @@ def test_integrate_fallback(x):
     result = integrate(expr, x)
 
     assert simplify(diff(result, x) - expr) == 0
+
+
+def test_integrate_linear_argument(x):
+    """Test the closed-form table for every supported family with a linear argument."""
+    for f in (sin, cos, exp, sinh, cosh):
+        expr = (Rational(2, 3) * x**4 - x + 5) * f(-2 * x + Rational(1, 2))
+
+        result = integrate(expr, x)
+
+        assert not result.has(Integral)
+        assert simplify(diff(result, x) - expr) == 0
+
+
+def test_integrate_high_degree_sparse(x):
+    """Test for correctness for a high-degree sparse polynomial in closed form."""
+    expr = (10 * x**50 + 5 * x**25 + 1) * sin(x)
+
+    result = integrate(expr, x)
+
+    assert expand(diff(result, x) - expr) == 0
+
+
+def test_integrate_multiple_polynomial_factors(x):
+    """Test that every polynomial factor is folded into the tabular polynomial."""
+    expr = Mul(x + 1, x**2 - 3, exp(3 * x), evaluate=False)
+
+    result = integrate(expr, x)
+
+    assert simplify(diff(result, x) - expr) == 0
+
+
+def test_integrate_antiderivative_cache(x):
+    """Test that the antiderivatives of a generic transcendental part are reused."""
+    ANTIDERIVATIVE_CACHE.clear()
+    v = exp(x) * sin(x)
+
+    first = integrate(x**2 * v, x)
+    hits = ANTIDERIVATIVE_CACHE.hits
+    second = integrate(3 * x**3 * v, x)
+
+    assert ANTIDERIVATIVE_CACHE.hits == hits + 1
+    assert simplify(diff(first, x) - x**2 * v) == 0
+    assert simplify(diff(second, x) - 3 * x**3 * v) == 0
+
+
+def test_integrate_antiderivative_cache_threads(x):
+    """Test that concurrent misses on the antiderivative cache do not duplicate rows."""
+    ANTIDERIVATIVE_CACHE.clear()
+    expr = x**4 * atan(x)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda _: integrate(expr, x), range(6)))
+
+    assert len(ANTIDERIVATIVE_CACHE.get((atan(x), x))) == 5
+    assert all(simplify(diff(r, x) - expr) == 0 for r in results)
+
+
+def test_integrate_polynomial_product(x):
+    """Test the coefficient antiderivative of a product of polynomial factors."""
+    expr = Mul(
+        x**2 + 3 * x + 1, x**2 - 3 * x + 1, Rational(1, 2) * x**4 + 1, evaluate=False
+    )
+
+    result = integrate_polynomial(expr, x)
+
+    assert expand(diff(result, x) - expr) == 0
+    assert result.subs(x, 0) == 0
+
+
+def test_integrate_polynomial_fallback(x):
+    """Test SymPy safety fallback for non-polynomial input."""
+    expr = x * sin(x)
+
+    result = integrate_polynomial(expr, x)
+
+    assert simplify(diff(result, x) - expr) == 0
@@ -1,6 +1,16 @@
 from sympy import expand, Mul, simplify, sin, Rational, Float
 
-from neuralsutra.kernels.multiply import multiply
+from neuralsutra.kernels import multiply as multiply_module
+from neuralsutra.kernels.multiply import (
+    karatsuba,
+    multiply,
+    ntt,
+    product,
+    product_tree,
+    urdhva,
+    urdhva_sparse,
+)
+from neuralsutra.kernels.poly import CoeffPoly
 
 
 def test_multiply_basic(x):
@@ -103,3 +113,79 @@ def test_multiply_fallback(x):
 
     assert result == expected
     assert result.has(sin)
+
+
+def test_multiply_sparse_high_degree(x):
+    """Test for correctness of the sparse path on high-degree, low-density factors."""
+    p1 = 10 * x**250 + Rational(5, 3) * x**125 + 1
+    p2 = x**300 - 4 * x**7
+    expr = Mul(p1, p2, evaluate=False)
+
+    result = multiply(expr, x)
+    expected = expand(p1 * p2)
+
+    assert simplify(result - expected) == 0
+
+
+def test_sparse_and_dense_products_agree(x):
+    """Test that the sparse and dense convolutions produce identical coefficients."""
+    p1 = CoeffPoly.from_expr(x**50 + 3 * x**20 + 1, x)
+    p2 = CoeffPoly.from_expr(x**50 - Rational(1, 2) * x + 2, x)
+
+    assert urdhva_sparse(p1, p2) == urdhva(p1, p2)
+    assert product(p1, p2) == urdhva(p1, p2)
+
+
+def test_dense_engines_agree(x):
+    """Test that the Karatsuba and NTT engines match the schoolbook convolution."""
+    p1 = CoeffPoly([Rational(k % 7 - 3, k % 4 + 1) for k in range(1, 151)])
+    p2 = CoeffPoly([(-1) ** k * (10**12 + k) for k in range(1, 90)])
+
+    expected = urdhva(p1, p2)
+
+    assert karatsuba(p1, p2) == expected
+    assert ntt(p1, p2) == expected
+
+
+def test_multiply_dense_tiers(x, monkeypatch):
+    """Test for correctness when the product is routed through every dense engine."""
+    p1 = sum((k + 1) * x**k for k in range(40))
+    p2 = sum(Rational(1, k + 1) * x**k for k in range(30))
+    expr = Mul(p1, p2, evaluate=False)
+    expected = expand(p1 * p2)
+
+    for karatsuba_threshold, ntt_threshold in [(4, 1000), (4, 8)]:
+        monkeypatch.setattr(multiply_module, "KARATSUBA_THRESHOLD", karatsuba_threshold)
+        monkeypatch.setattr(multiply_module, "NTT_THRESHOLD", ntt_threshold)
+
+        assert expand(multiply(expr, x) - expected) == 0
+
+
+def test_multiply_many_factors(x):
+    """Test for correctness when a product of many factors is reduced as a tree."""
+    factors = [x**2 + k * x + Rational(1, k) for k in range(1, 10)] + [x**4 + 1]
+    expr = Mul(*factors, evaluate=False)
+
+    result = multiply(expr, x)
+    expected = expand(Mul(*factors))
+
+    assert simplify(result - expected) == 0
+
+
+def test_multiply_mixed_factors(x):
+    """Test that non-polynomial factors are distributed over the polynomial product."""
+    expr = Mul(x + 1, x - 1, 3, sin(x), evaluate=False)
+
+    result = multiply(expr, x)
+
+    assert result == expand(3 * (x**2 - 1) * sin(x))
+
+
+def test_product_tree(x):
+    """Test the balanced product tree, including the empty product."""
+    polys = [CoeffPoly.from_expr(x + k, x) for k in range(5)]
+
+    assert product_tree(polys) == CoeffPoly.from_expr(
+        expand(Mul(*[x + k for k in range(5)])), x
+    )
+    assert product_tree([]) == CoeffPoly([1])
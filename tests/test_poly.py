@@ -0,0 +1,54 @@
+from fractions import Fraction
+
+import pytest
+from sympy import Rational, Symbol, expand
+
+from neuralsutra.kernels.poly import CoeffPoly, div
+
+
+def test_round_trip(x):
+    """Test that SymPy polynomials survive conversion to and from coefficients."""
+    expr = Rational(1, 2) * x**5 - 3 * x**2 + Rational(7, 3)
+
+    p = CoeffPoly.from_expr(expr, x)
+
+    assert p.degree == 5
+    assert p.coeffs == [Fraction(1, 2), 0, 0, -3, 0, Fraction(7, 3)]
+    assert expand(p.to_expr(x) - expr) == 0
+
+
+def test_integer_coefficients_stay_native(x):
+    """Test that integral coefficients are kept as Python ints."""
+    p = CoeffPoly.from_expr(4 * x**2 + 2 * x - 6, x)
+
+    assert all(type(c) is int for c in p.coeffs)
+
+
+def test_sparse_terms(x):
+    """Test conversion between the dense and sparse representations."""
+    p = CoeffPoly.from_expr(x**50 + 2 * x**3 + 1, x)
+
+    assert p.terms() == {50: 1, 3: 2, 0: 1}
+    assert CoeffPoly.from_terms(p.terms()) == p
+
+
+def test_zero_and_derivative(x):
+    """Test leading zero stripping and term-by-term differentiation."""
+    assert CoeffPoly([0, 0, 3, 1]).coeffs == [3, 1]
+    assert CoeffPoly([]).is_zero
+    assert CoeffPoly.from_expr(x**3 + x, x).derivative() == CoeffPoly([3, 0, 1])
+    assert CoeffPoly([5]).derivative().is_zero
+
+
+def test_exact_division():
+    """Test that coefficient division is exact and keeps integers as int."""
+    assert div(6, 3) == 2 and type(div(6, 3)) is int
+    assert div(1, 3) == Fraction(1, 3)
+    assert div(Fraction(3, 4), Fraction(1, 4)) == 3
+
+
+def test_non_rational_coefficients(x):
+    """Test that symbolic coefficients are rejected."""
+    a = Symbol("a")
+    with pytest.raises(ValueError):
+        CoeffPoly.from_expr(a * x + 1, x)
@@ -0,0 +1,25 @@
+import pytest
+from sympy import sympify
+
+from neuralsutra.prerouter import classify
+
+
+@pytest.mark.parametrize(
+    "integrand, intent",
+    [
+        ("x**5 + 3*x - 1", 1),
+        ("(x**2 + 1)*(x - 3)", 1),
+        ("(x**3 + 2)/(x + 1)", 2),
+        ("x**2*sin(3*x + 1)", 3),
+        ("(x + 1)*exp(x)", 3),
+        ("x*cos(x**2)", None),
+        ("sin(x)", None),
+        ("x*log(x)", None),
+        ("1/((x + 1)*(x + 2))", None),
+        ("sqrt(x)", None),
+        ("x*y", None),
+    ],
+)
+def test_classify(integrand, intent):
+    """Test that only structurally unambiguous integrands are classified."""
+    assert classify(sympify(integrand)) == intent
@@ -0,0 +1,44 @@
+import pytest
+
+from sympy import Integral, Rational, atan, diff, log, simplify, sin, sympify
+
+from neuralsutra.kernels.rational import integrate_rational
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "(x**4 + 2) / (x + 2)",
+        "(x**6 + 1) / (x - 1)",
+        "(x**3 + 5) / (2*x**2 - 3*x + 1)",
+        "(x + 2) / (x**2 + 2*x + 1)",
+        "1 / (x**2 - 2)",
+        "(x**5 + 1) / ((x**2 + 1) * (x - 3) * (2*x + 1))",
+        "(x**2 + 1) / (x + 1)**3",
+        "(x**3/4 + 5*x/2 - 1) / (x - 1/2)",
+    ],
+)
+def test_integrate_rational(x, expr):
+    """Test for correctness across linear, quadratic and factored denominators."""
+    expr = sympify(expr)
+
+    result = integrate_rational(expr, x)
+
+    assert not result.has(Integral)
+    assert simplify(diff(result, x) - expr) == 0
+
+
+def test_integrate_rational_atan(x):
+    """Test that an irreducible quadratic denominator gives log and atan terms."""
+    result = integrate_rational((3 * x + 1) / (x**2 + 1), x)
+
+    assert result == Rational(3, 2) * log(x**2 + 1) + atan(x)
+
+
+def test_integrate_rational_fallback(x):
+    """Test SymPy safety fallback."""
+    expr = sin(x) / (x + 1)
+
+    result = integrate_rational(expr, x)
+
+    assert result == Integral(expr, x)
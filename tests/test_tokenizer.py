@@ -0,0 +1,97 @@
+from sympy import (
+    Add,
+    E,
+    Float,
+    Function,
+    I,
+    Integral,
+    Mul,
+    Pow,
+    Rational,
+    Symbol,
+    cos,
+    exp,
+    log,
+    pi,
+    sin,
+    srepr,
+)
+
+from neuralsutra.data.generate import generate_dataset
+from neuralsutra.tokenizer import Tokenizer, split_srepr, summarize
+from neuralsutra.vocab import build_vocab
+
+
+def srepr_ids(node, vocab):
+    """Tokenize a node the original way, by splitting its srepr string."""
+    return [vocab.get(t, 0) for t in split_srepr(srepr(node))]
+
+
+def test_encode_matches_srepr(x):
+    """Test that walking the tree gives the same IDs as splitting srepr strings."""
+    vocab = build_vocab(generate_dataset(10))
+    tokenizer = Tokenizer(vocab)
+
+    exprs = [
+        Mul(
+            Add(x**2, Rational(-3, 4) * x, 1, evaluate=False),
+            sin(-2 * x),
+            evaluate=False,
+        ),
+        Mul(x**3 + 2, Pow(x + 1, -1, evaluate=False), evaluate=False),
+        pi * x + E - I * x / 3,
+        Float(1.5) * x ** Rational(1, 3) + exp(-x) * log(abs(x)),
+        Function("f")(x) + Integral(cos(x) ** 2, x),
+    ]
+
+    for expr in exprs:
+        assert tokenizer.encode(expr).tolist() == srepr_ids(expr, vocab)
+        assert tokenizer.encode_string(srepr(expr)).tolist() == srepr_ids(expr, vocab)
+
+
+def test_encode_caches_subtrees(x):
+    """Test that repeated subtrees are only tokenized once."""
+    tokenizer = Tokenizer({})
+    term = x**2 * sin(x)
+
+    tokenizer.encode(term + 1)
+    misses = tokenizer.cache.misses
+    tokenizer.encode(term - 1)
+
+    # Only the new sum and its -1 term are tokenized
+    assert tokenizer.cache.misses == misses + 2
+
+
+def test_summarize_large_expression(x):
+    """Test that long sums and large coefficients are collapsed into bucketed tokens."""
+    poly = Add(*[(k + 1) * x**k for k in range(200)], 123456789 * x**200)
+    summary = summarize(poly * sin(x))
+
+    assert summary.has(Symbol("<terms:256>"), Symbol("<digits:16>"))
+    assert len(summary.args[0].args) == 9
+    assert summarize(x**2 * sin(x)) == x**2 * sin(x)
+
+
+def test_encode_max_length(x):
+    """Test that long sequences are summarized and capped, and short ones are not."""
+    vocab = build_vocab(generate_dataset(10, max_length=64, large_fraction=0.5))
+    tokenizer = Tokenizer(vocab)
+    poly = Add(*[(k + 1) * x**k for k in range(200)])
+
+    assert any(t.startswith("'<terms:") for t in vocab)
+    assert (
+        tokenizer.encode(poly * sin(x), max_length=64).tolist()
+        == srepr_ids(summarize(poly * sin(x)), vocab)[:64]
+    )
+    assert tokenizer.encode(sin(x), max_length=64).tolist() == srepr_ids(sin(x), vocab)
+
+
+def test_encode_max_length_skips_full_tokenization(x):
+    """Test that a node clearly over max_length is summarized without being tokenized."""
+    tokenizer = Tokenizer(build_vocab(generate_dataset(10)))
+    poly = Add(*[(k + 1) * x**k for k in range(2000)])
+
+    ids = tokenizer.encode(poly * sin(x), max_length=64)
+
+    assert ids.tolist() == tokenizer.encode(summarize(poly * sin(x))).tolist()[:64]
+    assert poly not in tokenizer.cache
@@ -1,8 +1,12 @@
 import pytest
 
-from sympy import sympify
+from sympy import Float, Integral, exp, sympify
 
-from neuralsutra.verification import verify_integration
+from neuralsutra.verification import (
+    chebyshev_points,
+    verify_integration,
+    verify_numerically,
+)
 
 
 @pytest.mark.parametrize(
@@ -28,9 +32,49 @@ from neuralsutra.verification import verify_integration
         ("0", "10", True),  # Derivative of constant is 0
     ],
 )
-def test_verify_integration_logic(x, original, integrated, expected):
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_verify_integration_logic(x, original, integrated, expected, vectorized):
     # Convert strings into SymPy objects
     orig_expr = sympify(original)
     int_res = sympify(integrated) if integrated is not None else None
 
-    assert verify_integration(orig_expr, int_res, x) == expected
+    assert verify_integration(orig_expr, int_res, x, vectorized=vectorized) == expected
+
+
+def test_vectorized_checks_more_points(x):
+    """Test that a result only correct at the fixed sample points fails when vectorized."""
+    integrand = sympify("(x - 2)*(x - 3)*(x - 4)")
+
+    assert verify_integration(integrand, sympify("0"), x)
+    assert not verify_integration(integrand, sympify("0"), x, vectorized=True)
+
+
+def test_vectorized_tolerance(x):
+    """Test that the tolerance of the high-precision comparison is configurable."""
+    integrated = sympify("x**3/3 + x/10**9")
+
+    assert not verify_integration(sympify("x**2"), integrated, x, vectorized=True)
+    assert verify_integration(
+        sympify("x**2"), integrated, x, vectorized=True, tolerance=1e-6
+    )
+
+
+def test_vectorized_tolerance_every_point(x):
+    """Test that the tolerance also applies to points not re-checked with mpmath."""
+    # An error that vanishes at the three confirm points, spread over the interval
+    points = chebyshev_points(64)[[0, 31, 63]]
+    error = 10**-10 * (x - Float(points[0])) * (x - Float(points[1])) * (x - points[2])
+    integrated = x**3 / 3 + Integral(error, x).doit()
+
+    assert not verify_integration(x**2, integrated, x, vectorized=True)
+    assert verify_integration(x**2, integrated, x, vectorized=True, tolerance=1e-6)
+
+
+def test_vectorized_rechecks_overflow(x):
+    """Test that points where floats overflow are re-checked with mpmath."""
+    bump = exp(-50 * (x - 1.5) ** 2)
+    expr = exp(800 * bump)
+
+    # The two expressions only differ noticeably where expr overflows a float
+    assert not verify_numerically(expr, expr * (1 + bump**400), x)
+    assert verify_numerically(expr, expr, x)